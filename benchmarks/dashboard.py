@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+Runs synthetic dashboards headless, on a stubbed Tk, and measures:
+
+* startup: seconds to read the configuration and create the dashboard
+* polls-per-second: sensor results per second
+* latency: seconds from a sensor result to the refresh drawing it
+* refresh, layout: seconds per refresh() and layout() pass
+* cpu-seconds: user and system time of tiny-dash and the sensor programs
+* rss-bytes: resident set size of tiny-dash at the end of the run
+
+The dashboards have an equal mix of Status, Fraction and State sensors running trivial
+programs. Each size runs in a process of its own. The results are printed, or written to
+a file, as JSON, so that runs can be compared:
+
+    python benchmarks/dashboard.py --sizes 10 100 1000 --duration 10 --output before.json
+"""
+import argparse
+import imp
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SENSORS = (("Status", "Lamp", ['true']),
+           ("Fraction", "Meter", ['sh', '-c', 'echo 0.5']),
+           ("State", "Lamp", ['sh', '-c', 'echo ok']))
+
+
+def write_config(path, size, update_interval):
+    """Write a dashboard configuration with "size" indicators, each with a sensor of its own."""
+    with open(path, 'w') as fp:
+        fp.write('- defaults:\n    update-interval: {}\n    state-colors: {{ok: green}}\n'.format(update_interval))
+        for i in range(size):
+            sensor, indicator, program = SENSORS[i % len(SENSORS)]
+            # The extra argument, ignored by the program, makes each sensor unique so that none are shared
+            fp.write('- sensor: {}\n  type: {}\n  name: "{} {}"\n  program: {}\n'.format(
+                sensor, indicator, sensor, i, json.dumps(program + [str(i)])))
+
+
+def summary(values):
+    """
+    :return: count, mean, percentiles and max of a list of numbers, in a dict
+    """
+    if not values:
+        return {'count': 0}
+    values = sorted(values)
+    return {'count': len(values),
+            'mean': sum(values) / len(values),
+            'p50': values[len(values) // 2],
+            'p90': values[int(len(values) * 0.9)],
+            'p99': values[int(len(values) * 0.99)],
+            'max': values[-1]}
+
+
+def rss():
+    with open('/proc/self/statm') as fp:
+        return int(fp.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def cpu_seconds():
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return sum(u.ru_utime + u.ru_stime for u in usage)
+
+
+def run(args):
+    """Run one dashboard of args.size indicators, and return the results."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import stubtk
+    stubtk.install()
+    from twisted.internet import reactor
+    tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+    directory = tempfile.mkdtemp()
+    try:
+        config = os.path.join(directory, 'dashboard.config')
+        write_config(config, args.size, args.update_interval)
+
+        polls = []
+        put_times = {}
+        latencies = []
+        refreshes = []
+        layouts = []
+
+        publish = tiny.SensorBase.publish
+
+        def timed_publish(sensor, *publish_args, **kwargs):
+            polls.append(time.time())
+            publish(sensor, *publish_args, **kwargs)
+        tiny.SensorBase.publish = timed_publish
+
+        put = tiny.ValueSlot.put
+
+        def timed_put(slot, item):
+            put_times[id(slot)] = time.time()
+            put(slot, item)
+        tiny.ValueSlot.put = timed_put
+
+        refresh = tiny.TinyDashApp.refresh
+
+        def timed_refresh(app):
+            start = time.time()
+            for emitter in app.dirty:
+                if emitter in app.visible and id(emitter.queue) in put_times:
+                    latencies.append(start - put_times[id(emitter.queue)])
+            refresh(app)
+            refreshes.append(time.time() - start)
+        tiny.TinyDashApp.refresh = timed_refresh
+
+        layout = tiny.TinyDashApp.layout
+
+        def timed_layout(app, *layout_args):
+            start = time.time()
+            layout(app, *layout_args)
+            layouts.append(time.time() - start)
+        tiny.TinyDashApp.layout = timed_layout
+
+        sys.argv = ['tiny-dash.py', '--config-dir', os.path.join(directory, 'config-dir'),
+                    '--renderer', args.renderer, '--jitter', str(args.jitter)] + args.options + [config]
+        root = stubtk.Tk()
+        start = time.time()
+        app = tiny.TinyDashApp(root, tiny.parse_args())
+        startup = time.time() - start
+
+        # Resize the window now and then, as a user would
+        def resize(width):
+            root.geometry('{}x{}'.format(width, 1))
+            app.layout()
+            reactor.callLater(1.0, resize, 1200 if width != 1200 else 800)
+        reactor.callLater(1.0, resize, 800)
+
+        cpu = cpu_seconds()
+        start = time.time()
+        # Not reactor.stop(), which would close the pipes of the running programs and fail their sensors
+        reactor.callLater(args.duration, reactor.crash)
+        reactor.run()
+        elapsed = time.time() - start
+        cpu = cpu_seconds() - cpu
+
+        return {'size': args.size,
+                'renderer': args.renderer,
+                'options': args.options,
+                'duration': elapsed,
+                'startup': startup,
+                'polls-per-second': len([t for t in polls if t >= start]) / elapsed,
+                'latency': summary(latencies),
+                'refresh': summary(refreshes),
+                'layout': summary(layouts),
+                'cpu-seconds': cpu,
+                'cpu-percent': 100.0 * cpu / elapsed,
+                'rss-bytes': rss()}
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tiny-dash dashboards headless')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='Numbers of indicators. Default is 10 100 1000 10000')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run each dashboard. Default is 10')
+    parser.add_argument('--update-interval', type=float, default=1.0,
+                        help='Update interval of the sensors. Default is 1.0')
+    parser.add_argument('--jitter', type=float, default=1.0, help='Jitter of the first updates. Default is 1.0')
+    parser.add_argument('--renderer', choices=['widgets', 'canvas'], default='canvas',
+                        help='tiny-dash renderer. Default is canvas')
+    parser.add_argument('--output', help='Write the results to this file instead of stdout')
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('options', nargs=argparse.REMAINDER,
+                        help='Further tiny-dash options, after --, e.g. -- --launcher --max-children 16')
+    args = parser.parse_args()
+    if args.options and args.options[0] == '--':
+        args.options = args.options[1:]
+
+    if args.size:
+        # Child process running one dashboard
+        json.dump(run(args), sys.stdout)
+        return
+
+    results = []
+    for size in args.sizes:
+        command = [sys.executable, os.path.abspath(__file__), '--size', str(size), '--duration', str(args.duration),
+                   '--update-interval', str(args.update_interval), '--jitter', str(args.jitter),
+                   '--renderer', args.renderer, '--'] + args.options
+        sys.stderr.write('Running {} indicators for {} seconds\n'.format(size, args.duration))
+        output = subprocess.check_output(command)
+        results.append(json.loads(output.strip().split('\n')[-1]))
+
+    report = {'python': platform.python_version(),
+              'platform': platform.platform(),
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
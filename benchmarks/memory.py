@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Measures the memory used per indicator, with its sensor and value slot, on a stubbed
+surface, so that only the Python objects of tiny-dash are counted and not those of Tk.
+
+Prints a JSON object with the results, e.g.:
+
+    python benchmarks/memory.py --count 10000 Lamp Meter
+"""
+import argparse
+import gc
+import imp
+import json
+import os
+import sys
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class StubCanvas(object):
+    """Canvas which only hands out item ids."""
+
+    def __init__(self):
+        self.items = 0
+
+    def _create(self, *args, **kwargs):
+        self.items += 1
+        return self.items
+
+    create_oval = create_rectangle = create_arc = create_line = _create
+
+    def itemconfigure(self, *args, **kwargs):
+        pass
+
+
+class StubSurface(object):
+    """Surface drawing all indicators on one stub canvas, like the canvas renderer."""
+
+    def __init__(self):
+        self.canvas = StubCanvas()
+        self.tags = 0
+
+    def winfo_rgb(self, color):
+        return (0, 65535, 0) if color in ('green', '#00ff00') else (65535, 0, 0)
+
+    def new_canvas(self, width, height):
+        self.tags += 1
+        return self.canvas, 'i{}'.format(self.tags)
+
+
+def rss():
+    """
+    :return: the resident set size in bytes, None if unknown
+    """
+    try:
+        with open('/proc/self/statm') as fp:
+            return int(fp.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def object_size(obj):
+    """
+    :return: the size of an object and its __dict__, if any, in bytes
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(type(obj), '__dict__') and '__dict__' in dir(obj) and vars(obj):
+        size += sys.getsizeof(vars(obj))
+    return size
+
+
+def measure(indicator, count):
+    """
+    Create indicators, each with a sensor of its own.
+
+    :param indicator: name of the indicator type
+    :param count: number of indicators
+    :return: dict with the results
+    """
+    surface = StubSurface()
+    sensor_class = tiny.FractionSensor if indicator == 'Meter' else tiny.StatusSensor
+    gc.collect()
+    before = rss()
+    things = []
+    for i in range(count):
+        config = {'type': indicator, 'program': ['check', str(i)], 'width': 40, 'height': 40, 'update-interval': 5.0}
+        slot = tiny.ValueSlot()
+        sensor = sensor_class(slot, config)
+        sensor.configure(config)
+        things.append((tiny.INDICATORS[indicator](surface, slot, config), sensor, slot))
+    gc.collect()
+    after = rss()
+    emitter, sensor, slot = things[0]
+    return {'indicator': indicator,
+            'count': count,
+            'rss-bytes-per-indicator': (after - before) / float(count) if before is not None else None,
+            'indicator-bytes': object_size(emitter),
+            'sensor-bytes': object_size(sensor),
+            'slot-bytes': object_size(slot)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure memory per indicator')
+    parser.add_argument('indicators', nargs='*', default=['Lamp', 'Meter'], help='Indicator types to measure')
+    parser.add_argument('--count', type=int, default=10000, help='Number of indicators. Default is 10000')
+    args = parser.parse_args()
+    json.dump([measure(indicator, args.count) for indicator in args.indicators], sys.stdout, indent=2,
+              sort_keys=True)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
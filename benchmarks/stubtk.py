@@ -0,0 +1,154 @@
+"""
+Minimal stand-in for the Tkinter module, so that tiny-dash can be benchmarked without a
+display. Widgets only keep what tiny-dash reads back, canvas items are counted and their
+options stored, and after() is served by the twisted reactor.
+
+Install it before loading tiny-dash:
+
+    import stubtk
+    stubtk.install()
+"""
+import sys
+
+from twisted.internet import reactor
+
+__all__ = ['BOTH', 'X', 'Y', 'BOTTOM', 'HIDDEN', 'NORMAL', 'Tk', 'Toplevel', 'Frame', 'Label', 'StringVar', 'Canvas']
+
+BOTH = 'both'
+X = 'x'
+Y = 'y'
+BOTTOM = 'bottom'
+HIDDEN = 'hidden'
+NORMAL = 'normal'
+
+
+class Misc(object):
+    """Methods common to all widgets."""
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = options
+        self.bindings = {}
+
+    def pack(self, **options):
+        pass
+
+    def place(self, **options):
+        self.options.update(options)
+
+    def bind(self, sequence, func, add=None):
+        self.bindings[sequence] = func
+
+    def destroy(self):
+        pass
+
+    def after(self, ms, func, *args):
+        return reactor.callLater(ms / 1000.0, func, *args)
+
+    def after_cancel(self, timer):
+        if timer.active():
+            timer.cancel()
+
+    def update(self):
+        pass
+
+    def winfo_rgb(self, color):
+        if color.startswith('#') and len(color) in (7, 13):
+            digits = (len(color) - 1) // 3
+            return tuple(int(color[1 + i * digits:1 + (i + 1) * digits], 16) * (65535 // (16 ** digits - 1))
+                         for i in range(3))
+        value = hash(color)
+        return value & 0xffff, (value >> 16) & 0xffff, (value >> 32) & 0xffff
+
+    def winfo_width(self):
+        return self.root().width
+
+    def winfo_height(self):
+        return self.root().height
+
+    def winfo_ismapped(self):
+        return True
+
+    def root(self):
+        widget = self
+        while widget.master is not None:
+            widget = widget.master
+        return widget
+
+
+class Tk(Misc):
+    """Root window, with a size which can be set with geometry()."""
+
+    def __init__(self):
+        super(Tk, self).__init__()
+        # Size 1x1, like an unmapped window, lets tiny-dash treat all indicators as visible
+        self.width = 1
+        self.height = 1
+
+    def geometry(self, geometry=None):
+        if geometry is None:
+            return '{}x{}+0+0'.format(self.width, self.height)
+        size = geometry.split('+')[0]
+        if 'x' in size:
+            self.width, self.height = (int(value) for value in size.split('x'))
+
+    def protocol(self, name, func):
+        pass
+
+
+class Toplevel(Misc):
+    pass
+
+
+class Frame(Misc):
+    pass
+
+
+class Label(Misc):
+    pass
+
+
+class StringVar(object):
+    def __init__(self, value=''):
+        self.value = value
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class Canvas(Misc):
+    """Canvas which stores the options of its items."""
+
+    def __init__(self, master=None, **options):
+        super(Canvas, self).__init__(master, **options)
+        self.items = {}
+        self.last_item = 0
+        # Number of item changes, i.e. what would be drawn
+        self.changes = 0
+
+    def _create(self, *coords, **options):
+        self.last_item += 1
+        self.items[self.last_item] = options
+        return self.last_item
+
+    create_oval = create_rectangle = create_arc = create_line = _create
+
+    def itemconfigure(self, item, **options):
+        self.changes += 1
+        self.items[item].update(options)
+
+    def move(self, tag, dx, dy):
+        self.changes += 1
+
+    def delete(self, tag):
+        for item, options in self.items.items():
+            if options.get('tags') == tag:
+                del self.items[item]
+
+
+def install():
+    """Make "import Tkinter" and "from Tkinter import *" use this module."""
+    sys.modules['Tkinter'] = sys.modules[__name__]
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+Program launcher for tiny-dash. Started once by tiny-dash with the --launcher option, it
+runs the sensor programs, so that the large dashboard process does not need to be forked
+for each sensor update.
+
+Requests are read from stdin, one JSON object per line:
+
+    {"id": 1, "program": ["ls", "-l"], "timeout": 10.0}
+
+Each program runs in a session of its own. The answer is printed on stdout when the program
+has ended, one JSON object per line:
+
+    {"id": 1, "status": 0, "output": "...", "errors": "", "timeout": false}
+
+The status is null if the program was killed by a signal. A program which has not ended
+within "timeout" seconds is killed with its process group, and "timeout" is true. The output
+is latin-1 decoded, so that any bytes survive the JSON encoding.
+
+The launcher kills all running programs and exits when stdin is closed.
+"""
+import errno
+import json
+import os
+import select
+import signal
+import sys
+import time
+import traceback
+
+
+class Child(object):
+    """
+    A running program, and the output collected from it.
+    """
+
+    def __init__(self, request):
+        """
+        Constructor. Starts the program.
+
+        :param request: the decoded request
+        """
+        self.id = request['id']
+        program = [str(arg) for arg in request['program']]
+        timeout = request['timeout'] if 'timeout' in request else None
+        self.deadline = time.time() + timeout if timeout else None
+        self.status = None
+        self.exited = False
+        self.timed_out = False
+
+        out_read, out_write = os.pipe()
+        err_read, err_write = os.pipe()
+        self.pid = os.fork()
+        if self.pid == 0:
+            try:
+                os.setsid()
+                null = os.open(os.devnull, os.O_RDONLY)
+                os.dup2(null, 0)
+                os.dup2(out_write, 1)
+                os.dup2(err_write, 2)
+                os.closerange(3, max_fd())
+                os.execvp(program[0], program)
+            except Exception:
+                os.write(2, traceback.format_exc())
+            os._exit(127)
+        os.close(out_write)
+        os.close(err_write)
+        self.pipes = {out_read: [], err_read: []}
+        self.output = self.pipes[out_read]
+        self.errors = self.pipes[err_read]
+
+    def read(self, fd):
+        """Read output of the program, closing the pipe at end of file."""
+        data = os.read(fd, 65536)
+        if data:
+            self.pipes[fd].append(data)
+        else:
+            os.close(fd)
+            del self.pipes[fd]
+
+    def kill(self):
+        """
+        Kill the program and its process group, which may outlive the program when its
+        children keep running in the background.
+        """
+        self.timed_out = True
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except OSError:
+            if self.exited:
+                # The pid may already belong to another process
+                return
+            # Not yet a group leader
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+    def exit(self, status):
+        """Record the exit status of the program."""
+        self.exited = True
+        if os.WIFEXITED(status):
+            self.status = os.WEXITSTATUS(status)
+
+    def done(self):
+        """
+        :return: whether the program has ended, and its output has been read. Output
+                 pipes kept open by programs escaping a killed process group are closed.
+        """
+        if not self.exited:
+            return False
+        if self.pipes and self.timed_out:
+            for fd in self.pipes.keys():
+                os.close(fd)
+            self.pipes.clear()
+        return not self.pipes
+
+    def answer(self):
+        """
+        :return: the answer line for the request
+        """
+        return json.dumps({'id': self.id,
+                           'status': self.status,
+                           'output': ''.join(self.output).decode('latin-1'),
+                           'errors': ''.join(self.errors).decode('latin-1'),
+                           'timeout': self.timed_out}) + '\n'
+
+
+def max_fd():
+    try:
+        return os.sysconf('SC_OPEN_MAX')
+    except (AttributeError, ValueError, OSError):
+        return 1024
+
+
+def main():
+    # SIGCHLD interrupts select(), so that ended programs are reaped right away
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    children = {}
+    buffer = ''
+    stdin = sys.stdin.fileno()
+    while True:
+        deadlines = [child.deadline for child in children.values() if child.deadline and not child.timed_out]
+        delay = max(0.0, min(deadlines) - time.time()) if deadlines else None
+        readers = {stdin: None}
+        for child in children.values():
+            for fd in child.pipes:
+                readers[fd] = child
+        try:
+            readable, _, _ = select.select(readers.keys(), [], [], delay)
+        except select.error as e:
+            if e.args[0] != errno.EINTR:
+                raise
+            readable = []
+
+        for fd in readable:
+            if fd != stdin:
+                readers[fd].read(fd)
+                continue
+            data = os.read(stdin, 65536)
+            if not data:
+                for child in children.values():
+                    child.kill()
+                return
+            lines = (buffer + data).split('\n')
+            buffer = lines.pop()
+            for line in lines:
+                if not line.strip():
+                    continue
+                child = Child(json.loads(line))
+                children[child.pid] = child
+
+        now = time.time()
+        for child in children.values():
+            # Also when the program has exited, but left children keeping its output open
+            if child.deadline and child.deadline <= now and not child.timed_out:
+                child.kill()
+
+        while children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                break
+            if not pid:
+                break
+            if pid in children:
+                children[pid].exit(status)
+
+        for pid, child in children.items():
+            if child.done():
+                del children[pid]
+                sys.stdout.write(child.answer())
+                sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
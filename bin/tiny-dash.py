@@ -1,35 +1,100 @@
 #!/usr/bin/env python
 import Queue
 import argparse
+import cPickle
+import collections
+import hashlib
+import heapq
+import itertools
 import json
+import multiprocessing
 import os
+import random
+import re
+import signal
+import stat
+import sys
+import time
 import traceback
+import urllib
 import yaml
 from Tkinter import *
-from twisted.internet import protocol, utils, task, tksupport, reactor
+from twisted.internet import defer, protocol, task, tksupport, reactor
+from twisted.internet.error import CannotListenError, ProcessExitedAlready
 from twisted.python import failure
+from twisted.python.filepath import FilePath
+from twisted.web.client import Agent, HTTPConnectionPool, readBody
+from twisted.web.http_headers import Headers
+from twisted.web import error as web_error
 from cStringIO import StringIO
+from distutils.spawn import find_executable
+
+try:
+    from twisted.internet import inotify
+except ImportError:
+    # Not on Linux
+    inotify = None
 
-import urllib2
 # from datetime import datetime
 # from urllib import urlencode
 
 import logging
 
-from copy import deepcopy
+
+def freeze(value):
+    """
+    Make a hashable copy of a configuration value, with lists as tuples and dicts as sorted
+    tuples of (key, value).
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def to_json(value):
+    """
+    Make a sensor value JSON serializable. Strings are program output, which may be in any
+    encoding, and are decoded as latin-1 so that any bytes survive, see from_json().
+    """
+    if isinstance(value, str):
+        return value.decode('latin-1')
+    if isinstance(value, dict):
+        return dict((to_json(key), to_json(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+
+def from_json(value):
+    """Turn the strings of a value made by to_json() back into the original bytes."""
+    if isinstance(value, unicode):
+        return value.encode('latin-1', 'replace')
+    if isinstance(value, dict):
+        return dict((from_json(key), from_json(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [from_json(item) for item in value]
+    return value
 
 
 class ColorShade(object):
     """
-    Handle color shading.
+    Handle color shading. The shades are computed once, into a table of "steps" colors, and
+    shared by all indicators using the same pair of colors, see get().
     """
+    __slots__ = ('min_rgb', 'max_rgb', 'r_diff', 'g_diff', 'b_diff', 'last_step', 'table')
 
-    def __init__(self, min_rgb, max_rgb):
+    # Shared shades, by (min_rgb, max_rgb, steps)
+    shades = {}
+
+    def __init__(self, min_rgb, max_rgb, steps=256):
         """
         Constructor.
         
         :param min_rgb: color at 0.0 as (R, G, B)
         :param max_rgb: color at 1.0 as (R, G, B)
+        :param steps: number of shades between, and including, the min and max colors
         """
         logging.debug('Min colors: {}'.format(min_rgb))
         logging.debug('Max colors: {}'.format(max_rgb))
@@ -39,26 +104,414 @@ class ColorShade(object):
         self.g_diff = self.max_rgb[1] - self.min_rgb[1]
         self.b_diff = self.max_rgb[2] - self.min_rgb[2]
         logging.debug('color diff: {},{},{}'.format(self.r_diff, self.g_diff, self.b_diff))
+        self.last_step = max(int(steps), 2) - 1
+        self.table = tuple(intern(self.compute(float(i) / self.last_step)) for i in range(self.last_step + 1))
 
-    def shade(self, fraction):
+    @classmethod
+    def get(cls, min_rgb, max_rgb, steps=256):
         """
-        Shade this color based on the given fraction
+        Get a shared shade.
+
+        :param min_rgb: color at 0.0 as (R, G, B)
+        :param max_rgb: color at 1.0 as (R, G, B)
+        :param steps: number of shades between, and including, the min and max colors
+        :return: a ColorShade
+        """
+        key = (tuple(min_rgb), tuple(max_rgb), steps)
+        if key not in cls.shades:
+            cls.shades[key] = ColorShade(min_rgb, max_rgb, steps)
+        return cls.shades[key]
+
+    def compute(self, fraction):
+        """
+        Compute the color for the given fraction.
         :param fraction:
-        :return: a color string "#rrggbb", e.g. "#ab34c4"
+        :return: a color string "#rrrrggggbbbb", e.g. "#ab0034ffc400"
         """
         return '#{:04x}{:04x}{:04x}'.format(int(self.min_rgb[0] + (self.r_diff * fraction)),
                                             int(self.min_rgb[1] + (self.g_diff * fraction)),
                                             int(self.min_rgb[2] + (self.b_diff * fraction)))
 
+    def shade(self, fraction):
+        """
+        Shade this color based on the given fraction
+        :param fraction: 0.0..1.0
+        :return: the closest color in the table
+        """
+        return self.table[int(fraction * self.last_step + 0.5)]
+
+
+class ValueSlot(object):
+    """
+    Passes sensor values to an indicator. Only the latest value is kept, so a sensor producing
+    values faster than the indicator is refreshed replaces the unseen value instead of building
+    a backlog. Has the put() and get() methods of Queue.Queue, but never blocks.
+    """
+    __slots__ = ('item', 'listener')
+
+    def __init__(self, listener=None):
+        """
+        Constructor.
+
+        :param listener: function to call when a value arrives in an empty slot
+        """
+        self.item = None
+        self.listener = listener
+
+    def put(self, item):
+        """
+        Store a value, replacing any value not yet fetched.
+
+        :param item: the value, not None
+        """
+        was_empty = self.item is None
+        self.item = item
+        if was_empty and self.listener:
+            self.listener()
+
+    def get(self, block=False, timeout=None):
+        """
+        Fetch the latest value and empty the slot.
+
+        :param block: ignored, the slot never blocks
+        :param timeout: ignored
+        :return: the latest value
+        :raise Queue.Empty: if no value has been put since last get()
+        """
+        item = self.item
+        if item is None:
+            raise Queue.Empty
+        self.item = None
+        return item
+
+    def empty(self):
+        return self.item is None
+
+
+class Histogram(object):
+    """
+    Counts durations in buckets growing by a factor 2, from 1 ms to about 2 minutes, so that
+    adding a value is cheap and the memory used does not grow. Percentiles are estimated as
+    the upper bound of their bucket.
+    """
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    # Upper bound of the first bucket, in seconds
+    FIRST = 0.001
+    BUCKETS = 18
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Allocated by the first add(), most histograms of an idle dashboard stay empty
+        self.buckets = None
+
+    def add(self, value):
+        """
+        Count a value.
+
+        :param value: seconds
+        """
+        if self.buckets is None:
+            self.buckets = [0] * (self.BUCKETS + 1)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        bucket = 0
+        bound = self.FIRST
+        while value > bound and bucket < self.BUCKETS:
+            bucket += 1
+            bound *= 2
+        self.buckets[bucket] += 1
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """
+        :param fraction: 0.5 for the median, 0.9 for the 90th percentile etc.
+        :return: the estimated percentile in seconds, not above the max, 0.0 if empty
+        """
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        bound = self.FIRST
+        for count in self.buckets[:-1]:
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.max)
+            bound *= 2
+        # The last bucket has no upper bound
+        return self.max
+
+    def as_dict(self):
+        """
+        :return: the count, mean, percentiles and max as a JSON serializable dict
+        """
+        return {'count': self.count,
+                'mean': self.mean(),
+                'p50': self.percentile(0.5),
+                'p90': self.percentile(0.9),
+                'p99': self.percentile(0.99),
+                'max': self.max}
+
+
+class SensorStats(object):
+    """
+    Statistics of a sensor: how long its runs take from start to result, how often its results
+    are broken, and how much time actually passes between results.
+    """
+    __slots__ = ('results', 'failures', 'durations', 'intervals', 'last_time')
+
+    def __init__(self):
+        self.results = 0
+        self.failures = 0
+        self.durations = Histogram()
+        self.intervals = Histogram()
+        self.last_time = None
+
+    def ran(self, duration):
+        """
+        Count a run of the sensor.
+
+        :param duration: seconds from starting the run until the result
+        """
+        self.durations.add(duration)
+
+    def published(self, result):
+        """
+        Count a fresh result of the sensor.
+
+        :param result: the result, broken if negative
+        """
+        now = time.time()
+        self.results += 1
+        if SensorBase.is_broken(result):
+            self.failures += 1
+        if self.last_time is not None:
+            self.intervals.add(now - self.last_time)
+        self.last_time = now
+
+    def as_dict(self):
+        return {'results': self.results,
+                'failures': self.failures,
+                'duration': self.durations.as_dict(),
+                'interval': self.intervals.as_dict()}
+
+    def summary(self, update_interval, max_interval=None):
+        """
+        :param update_interval: the configured update interval of the sensor in seconds
+        :param max_interval: the configured max interval of an adaptive sensor, or None
+        :return: a short text for the status bar
+        """
+        text = '{} results, {} failed'.format(self.results, self.failures)
+        if self.durations.count:
+            text += ', runs {:.0f} ms (p90 {:.0f} ms)'.format(self.durations.mean() * 1000,
+                                                              self.durations.percentile(0.9) * 1000)
+        if self.intervals.count:
+            text += ', every {:.1f} s'.format(self.intervals.mean())
+        if max_interval:
+            return text + ' (configured {:.1f}-{:.1f} s)'.format(update_interval, max_interval)
+        return text + ' (configured {:.1f} s)'.format(update_interval)
+
+
+class DashboardStats(object):
+    """
+    Statistics of the dashboard as a whole: how late the reactor runs timers, and how long
+    refreshes and layouts take.
+    """
+    # Seconds between reactor lag probes
+    PROBE_INTERVAL = 1.0
+
+    def __init__(self):
+        self.reactor_lag = Histogram()
+        self.refreshes = Histogram()
+        self.layouts = Histogram()
+        self.probe = None
+        self.probe_due = None
+
+    def start(self):
+        """Start probing the reactor lag."""
+        self.probe_due = reactor.seconds() + self.PROBE_INTERVAL
+        self.probe = reactor.callLater(self.PROBE_INTERVAL, self._probe)
+
+    def stop(self):
+        if self.probe and self.probe.active():
+            self.probe.cancel()
+        self.probe = None
+
+    def _probe(self):
+        self.reactor_lag.add(max(reactor.seconds() - self.probe_due, 0.0))
+        self.start()
+
+    def as_dict(self):
+        return {'reactor-lag': self.reactor_lag.as_dict(),
+                'refresh': self.refreshes.as_dict(),
+                'layout': self.layouts.as_dict()}
+
+
+class SensorScheduler(object):
+    """
+    Runs sensors when they are due, using a single timer for all sensors. Started sensors are
+    spread out over "jitter" seconds so they do not all run at the same time, and at most
+    "max_running" sensors may be running at the same time. Sensors becoming due while the
+    limit is reached wait for running sensors to finish. Suspended sensors are only run every
+    "background_interval" seconds.
+    """
+    # Seconds behind schedule before warning
+    LAG_WARNING = 1.0
+
+    def __init__(self, jitter=0.0, max_running=0, background_interval=60.0):
+        """
+        Constructor.
+
+        :param jitter: max seconds to delay the first run of a sensor
+        :param max_running: max number of sensors running at the same time, 0 for no limit
+        :param background_interval: min seconds between runs of suspended sensors
+        """
+        self.jitter = jitter
+        self.max_running = max_running
+        self.background_interval = background_interval
+        self.queue = []
+        self.sequence = itertools.count()
+        # Sequence number of the queue entry of each scheduled sensor, older entries are ignored
+        self.scheduled = {}
+        self.waiting = collections.deque()
+        # Start time of each running sensor
+        self.running = {}
+        # Start time of the last run of each sensor, to run suspended sensors in the background
+        self.last_run = {}
+        self.dispatching = False
+        self.timer = None
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.lags = Histogram()
+
+    def start(self, sensor, age=None):
+        """
+        Run a sensor for the first time, after a random delay within the jitter. A sensor
+        which has a value from an earlier run is not run before that value is due, so that
+        the stalest values are refreshed first.
+
+        :param sensor: the sensor
+        :param age: seconds since the sensor got its value, None if it has no value
+        """
+        delay = random.uniform(0.0, min(self.jitter, sensor.update_interval))
+        if age is not None:
+            delay = max(delay, sensor.update_interval - age)
+        self.schedule(sensor, delay)
+
+    def schedule(self, sensor, delay):
+        """
+        Call timeout_triggered() of a sensor after a delay. The sensor shall call finished()
+        when done, and have a SensorStats in "stats" to count the duration of the run in.
+
+        :param sensor: the sensor
+        :param delay: delay in seconds
+        """
+        sequence = next(self.sequence)
+        self.scheduled[sensor] = sequence
+        heapq.heappush(self.queue, (reactor.seconds() + delay, sequence, sensor))
+        self._arm()
+
+    def cancel(self, sensor):
+        """Do not run a sensor any more. A running sensor shall still call finished()."""
+        self.scheduled.pop(sensor, None)
+        self.last_run.pop(sensor, None)
+        self.waiting = collections.deque((due, waiting) for due, waiting in self.waiting if waiting is not sensor)
+
+    def run_now(self, sensor):
+        """Run a scheduled sensor right away instead of when it is due."""
+        if sensor in self.scheduled:
+            self.schedule(sensor, 0.0)
+
+    def finished(self, sensor):
+        """Called by a sensor when it is done running, to let waiting sensors run."""
+        if sensor in self.running:
+            sensor.stats.ran(reactor.seconds() - self.running.pop(sensor))
+            self._dispatch()
+
+    def _arm(self):
+        if not self.queue:
+            return
+        due = self.queue[0][0]
+        if self.timer and self.timer.active():
+            if self.timer.getTime() <= due:
+                return
+            self.timer.cancel()
+        self.timer = reactor.callLater(max(due - reactor.seconds(), 0.0), self._fire)
+
+    def _fire(self):
+        now = reactor.seconds()
+        while self.queue and self.queue[0][0] <= now:
+            due, sequence, sensor = heapq.heappop(self.queue)
+            if self.scheduled.get(sensor) != sequence:
+                continue
+            del self.scheduled[sensor]
+            self.waiting.append((due, sensor))
+        try:
+            self._dispatch()
+        finally:
+            self._arm()
+
+    def _dispatch(self):
+        # Sensors finishing right away call finished(), which must not recurse into here
+        if self.dispatching:
+            return
+        self.dispatching = True
+        try:
+            while self.waiting and (not self.max_running or len(self.running) < self.max_running):
+                due, sensor = self.waiting.popleft()
+                now = reactor.seconds()
+                if sensor.suspended and sensor in self.last_run:
+                    since = now - self.last_run[sensor]
+                    if since < self.background_interval:
+                        self.schedule(sensor, self.background_interval - since)
+                        continue
+                self._measure_lag(now - due)
+                self.running[sensor] = self.last_run[sensor] = now
+                try:
+                    sensor.timeout_triggered()
+                except Exception:
+                    # A broken sensor must not stop the others, try it again later
+                    logging.exception('Sensor %s failed', sensor)
+                    self.running.pop(sensor, None)
+                    if sensor not in self.scheduled:
+                        self.schedule(sensor, sensor.update_interval)
+        finally:
+            self.dispatching = False
+
+    def _measure_lag(self, lag):
+        if lag > self.LAG_WARNING and self.lag <= self.LAG_WARNING:
+            logging.warning('Sensors are running %.1f seconds behind schedule', lag)
+        self.lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.lags.add(lag)
+
 
 class SensorBase(object):
     """
     Base class for sensors executing external processes.
     """
+    # Attributes are kept in slots, sensors are many
+    __slots__ = ('queues', 'update_interval', 'value_type', 'max_interval', 'interval', 'last_result', 'suspended',
+                 'last_value', 'last_time', 'stopped', 'stats')
+
     STATUS = ':status'
     FRACTION = ':fraction'
     STATE = ':state'
 
+    # Scheduler for all sensors
+    scheduler = SensorScheduler()
+
+    # Configuration settings which make sensors of a class different, see identity()
+    KEYS = ('update-interval', 'min-interval', 'max-interval')
+
+    # Growth of adaptive intervals for each update with an unchanged result
+    INTERVAL_GROWTH = 1.5
+
     def __init__(self, queue, update_interval=10.0):
         """
         Constructor. This will create the sensor, but not start updates. Call the start()
@@ -67,10 +520,60 @@ class SensorBase(object):
         :param queue: the queue which this sensor shall put data in.
         :param update_interval: time in seconds (float) between sensor updates
         """
-        self.queue = queue
+        self.queues = [queue]
         self.update_interval = update_interval if update_interval else 5.0
-        self.timer = None
         self.value_type = None
+        self.max_interval = None
+        self.interval = self.update_interval
+        self.last_result = None
+        # Whether no indicator of the sensor can be seen
+        self.suspended = False
+        # Last published result, value type and whether it is stale, and when it was published
+        self.last_value = None
+        self.last_time = None
+        self.stopped = False
+        self.stats = SensorStats()
+
+    def configure(self, config):
+        """
+        Read the settings common to all sensors. With "max-interval", the update interval
+        grows while the result is unchanged, up to max-interval, and returns to "min-interval",
+        or update-interval, when the result changes or the sensor is broken.
+
+        :param config: the sensor configuration dict
+        """
+        if 'min-interval' in config and config['min-interval']:
+            self.update_interval = config['min-interval']
+        self.max_interval = config['max-interval'] if 'max-interval' in config else None
+        self.interval = self.update_interval
+
+    @classmethod
+    def identity(cls, config):
+        """
+        Identify the sensor a configuration would create. Indicators with configurations
+        of the same identity can share one sensor, see subscribe().
+
+        :param config: the sensor configuration dict
+        :return: a hashable identity
+        """
+        return (cls,) + tuple(freeze(config[key]) if key in config else None for key in cls.KEYS)
+
+    def subscribe(self, queue, config):
+        """
+        Put data in another queue too.
+
+        :param queue: the queue to put data in
+        :param config: the configuration dict of the indicator using the queue
+        """
+        self.queues.append(queue)
+
+    def unsubscribe(self, queue):
+        """
+        Stop putting data in a queue.
+
+        :param queue: a queue given to the constructor or subscribe()
+        """
+        self.queues.remove(queue)
 
     def start(self):
         """
@@ -79,8 +582,19 @@ class SensorBase(object):
         
         :return: 
         """
-        logging.debug('Sleeping for %f seconds', self.update_interval)
-        self.timer = reactor.callLater(0.0, self.timeout_triggered)
+        if self.last_time is None:
+            self.scheduler.start(self)
+        else:
+            self.scheduler.start(self, time.time() - self.last_time)
+
+    def stop(self):
+        """Stop updating the sensor, for good."""
+        self.stopped = True
+        self.scheduler.cancel(self)
+
+    def resume(self):
+        """Called when the sensor is no longer suspended, to get a fresh value right away."""
+        self.scheduler.run_now(self)
 
     def timeout_triggered(self):
         """
@@ -99,163 +613,1469 @@ class SensorBase(object):
         :param value_type: type of value. Default is self.value_type.
         :return: 
         """
-        logging.debug('Sensor result: %s', str(result))
-        self.queue.put({'value-type': value_type if value_type else self.value_type, 'result': result})
-        self.timer = reactor.callLater(self.update_interval, self.timeout_triggered)
+        self.publish(result, value_type)
+        interval = self.next_interval(result)
+        self.scheduler.finished(self)
+        if self.stopped:
+            return
+        logging.debug('Sleeping for %f seconds', interval)
+        self.scheduler.schedule(self, interval)
+
+    def next_interval(self, result):
+        """
+        :param result: the latest result
+        :return: seconds to the next update
+        """
+        if not self.max_interval:
+            return self.update_interval
+        if result == self.last_result and not self.is_broken(result):
+            self.interval = min(self.interval * self.INTERVAL_GROWTH, self.max_interval)
+        else:
+            self.interval = self.update_interval
+        self.last_result = result
+        return self.interval
+
+    @staticmethod
+    def is_broken(result):
+        """
+        :return: whether a result means that the sensor is broken
+        """
+        return isinstance(result, (int, float)) and result < 0
+
+    def publish(self, result, value_type=None, stale=False, fresh=True):
+        """
+        Put a result in the queue without touching the update timer. Used by sensors which
+        produce values on their own, outside of the update cycle.
+
+        :param result: data to send to emitter.
+        :param value_type: type of value. Default is self.value_type.
+        :param stale: whether the result is from an earlier run, see restore()
+        :param fresh: whether the result is new and shall be counted in the statistics
+        :return:
+        """
+        logging.debug('Sensor result: %r', result)
+        value_type = value_type if value_type else self.value_type
+        data = {'value-type': value_type, 'result': result}
+        if stale:
+            data['stale'] = True
+        for queue in self.queues:
+            queue.put(data)
+        self.last_value = (result, value_type, stale)
+        self.last_time = time.time()
+        if fresh and not stale:
+            self.stats.published(result)
+
+    def republish(self):
+        """Publish the last value again, e.g. for a new subscriber."""
+        if self.last_value is not None:
+            last_time = self.last_time
+            result, value_type, stale = self.last_value
+            self.publish(result, value_type, stale=stale, fresh=False)
+            self.last_time = last_time
+
+    def snapshot(self):
+        """
+        :return: the last published value as a JSON serializable dict, None if there is none
+        """
+        if self.last_value is None:
+            return None
+        result, value_type, _ = self.last_value
+        return {'result': to_json(result), 'value-type': value_type, 'time': self.last_time}
+
+    def restore(self, snapshot):
+        """
+        Publish a value saved by snapshot() in an earlier run, marked as stale until the
+        sensor gets a fresh value.
+
+        :param snapshot: a dict returned by snapshot()
+        """
+        self.publish(from_json(snapshot['result']), from_json(snapshot['value-type']), stale=True)
+        self.last_time = snapshot['time']
 
 
-class StatusSensor(SensorBase):
+# Sensor value types by name, for the "value-type" setting
+VALUE_TYPES = {'Status': SensorBase.STATUS,
+               'State': SensorBase.STATE,
+               'Fraction': SensorBase.FRACTION}
+
+
+def typed_value(value, value_type=None):
     """
-    Run a program and return the exit status during update.
+    Convert a value from a keyed sensor to a sensor result. Unless the value type is given,
+    integers are statuses, other numbers fractions, and anything else states.
+
+    :param value: the value, a number or a string
+    :param value_type: the wanted value type, or None to guess
+    :return: (result, value type)
     """
+    if value_type == SensorBase.STATE:
+        return str(value), value_type
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        if value_type:
+            return -1, value_type
+        return str(value), SensorBase.STATE
+    if value_type == SensorBase.FRACTION or (not value_type and isinstance(value, float)):
+        return number, SensorBase.FRACTION
+    if not value_type:
+        # Numbers like "0.5" or "1e-3" are fractions
+        try:
+            return int(value), SensorBase.STATUS
+        except ValueError:
+            return number, SensorBase.FRACTION
+    return int(number), SensorBase.STATUS
 
-    def __init__(self, queue, config):
+
+class KeyedSensor(object):
+    """
+    Mix-in for sensors producing many values at once, e.g. one program printing values for
+    several indicators. Each value has a key, and each indicator selects the value to show
+    with the "key" setting. The results of keyed sensors are dicts of values by key, and only
+    the keys in the dict are updated. Any other result is broken for all keys.
+
+    Sub-classes must initialize self.subscribers to an empty dict and self.queues to an empty
+    list, and then subscribe() the queue given to the constructor.
+    """
+    __slots__ = ()
+
+    # The setting selecting the value to show
+    KEY = 'key'
+
+    def subscribe(self, queue, config):
         """
-        Constructor.
+        Put the value of the configured key in a queue.
 
         :param queue: the queue to put data in
-        :param config: the sensor configuration dict
+        :param config: the configuration dict of the indicator using the queue
         """
-        super(StatusSensor, self).__init__(queue, config['update-interval'] if 'update-interval' in config else None)
-        self.program = config['program'] if 'program' in config else None
-        self.value_type = self.STATUS
+        value_type = VALUE_TYPES[config['value-type']] if config.get('value-type') in VALUE_TYPES else None
+        key = config[self.KEY] if self.KEY in config else None
+        self.subscribers.setdefault(key, []).append((queue, value_type))
+
+    def unsubscribe(self, queue):
+        for key, subscribers in self.subscribers.items():
+            subscribers[:] = [subscriber for subscriber in subscribers if subscriber[0] is not queue]
+            if not subscribers:
+                del self.subscribers[key]
+
+    def publish(self, result, value_type=None, stale=False, fresh=True):
+        self.put_values(result, stale)
+        # Results may only carry some of the keys, remember the latest value of each, and which
+        # are stale. The values are updated in place, sensors may have thousands of keys.
+        if isinstance(result, dict):
+            if self.last_value and isinstance(self.last_value[0], dict):
+                values, _, stale_keys = self.last_value
+                values.update(result)
+            else:
+                stale_keys = set()
+                self.last_value = (dict(result), None, stale_keys)
+            if stale:
+                stale_keys.update(result)
+            else:
+                stale_keys.difference_update(result)
+        else:
+            self.last_value = (result, None, stale)
+        self.last_time = time.time()
+        if fresh and not stale:
+            self.stats.published(result)
+
+    def republish(self):
+        """Publish the last values again, the stale ones marked as such."""
+        if self.last_value is None:
+            return
+        result, _, stale = self.last_value
+        if isinstance(result, dict):
+            self.put_values(dict((key, value) for key, value in result.items() if key not in stale), False)
+            self.put_values(dict((key, result[key]) for key in stale), True)
+        else:
+            self.put_values(result, stale)
 
-    def run(self):
+    def put_values(self, result, stale):
         """
-        Run the configured program and call the update() method with the exit status.
+        Put the values of a result in the queues of their keys.
+
+        :param result: values by key, anything else is broken for all keys
+        :param stale: whether the values are from an earlier run
         """
-        if not self.program:
-            self.update(-1)
-            return
-        use_shell = not (isinstance(self.program, (list, tuple)))
-        logging.debug('Calling %s',
-                      self.program if use_shell else ' '.join(self.program))
-        d = utils.getProcessValue(self.program[0], self.program[1:] if len(self.program) > 1 else [],
-                                  env=os.environ)
-        d.addCallback(self.update)
+        # Results often carry a single key, only broken results go to all subscribers
+        if isinstance(result, dict):
+            values = [(result[key], self.subscribers[key]) for key in result if key in self.subscribers]
+        else:
+            values = [(-1, subscribers) for subscribers in self.subscribers.values()]
+        for value, subscribers in values:
+            for queue, wanted_type in subscribers:
+                typed_result, typed_type = typed_value(value, wanted_type)
+                data = {'value-type': typed_type, 'result': typed_result}
+                if stale:
+                    data['stale'] = True
+                queue.put(data)
+
+    def snapshot(self):
+        """
+        :return: see SensorBase.snapshot(). Values by key are saved as a list of [key, value]
+                 pairs, so that keys which are not strings, e.g. CPU numbers, survive JSON.
+        """
+        snapshot = super(KeyedSensor, self).snapshot()
+        if snapshot and isinstance(snapshot['result'], dict):
+            snapshot['result'] = [[key, value] for key, value in snapshot['result'].items()]
+        return snapshot
+
+    def restore(self, snapshot):
+        """Restore the values saved by snapshot(), of the keys which are still subscribed to."""
+        result = from_json(snapshot['result'])
+        if isinstance(result, (list, dict)):
+            pairs = result.items() if isinstance(result, dict) else result
+            result = dict((key, value) for key, value in pairs if key in self.subscribers)
+        super(KeyedSensor, self).restore(dict(snapshot, result=result))
 
 
-class StateSensor(SensorBase):
+class StreamProtocol(protocol.ProcessProtocol):
     """
-    Run a program and return the first line of output.
+    Line oriented protocol for long-running sensor programs. Each complete line printed by the
+    program is handed to the sensor.
     """
 
-    def __init__(self, queue, config):
+    def __init__(self, sensor):
+        self.sensor = sensor
+        self.buffer = ''
+
+    def outReceived(self, data):
+        self.buffer += data
+        lines = self.buffer.split('\n')
+        self.buffer = lines.pop()
+        for line in lines:
+            self.sensor.line_received(line.strip())
+
+    def processEnded(self, reason):
+        self.sensor.stream_ended(reason)
+
+
+class ProcessTimeout(Exception):
+    """A sensor program did not finish in time."""
+
+
+class RunProtocol(protocol.ProcessProtocol):
+    """
+    Collects the output and exit status of a program run by ProcessRunner.
+    """
+
+    def __init__(self, runner, program, timeout):
+        self.runner = runner
+        self.program = program
+        self.timeout = timeout
+        self.deferred = defer.Deferred()
+        self.output = StringIO()
+        self.errors = StringIO()
+        self.timer = None
+
+    def connectionMade(self):
+        if self.timeout:
+            self.timer = reactor.callLater(self.timeout, self.timed_out)
+
+    def outReceived(self, data):
+        self.output.write(data)
+
+    def errReceived(self, data):
+        self.errors.write(data)
+
+    def processEnded(self, reason):
+        if self.timer and self.timer.active():
+            self.timer.cancel()
+        self.runner.ended(self)
+        if not self.deferred.called:
+            self.deferred.callback((reason.value.exitCode, self.output.getvalue(), self.errors.getvalue()))
+
+    def timed_out(self):
+        logging.warning('Killing %s, no result within %.1f seconds', self.program[0], self.timeout)
+        self.runner.kill(self.transport)
+        # The process is still counted as running until it has actually ended
+        self.deferred.errback(ProcessTimeout(self.program[0]))
+
+    def launched(self, answer):
         """
-        Constructor.
+        Called when a program run by the launcher has ended.
 
-        :param queue: the queue to put data in
-        :param config: the sensor configuration dict
+        :param answer: the decoded answer of the launcher, None if the launcher has died
         """
-        super(StateSensor, self).__init__(queue, config['update-interval'] if 'update-interval' in config else None)
-        self.program = config['program'] if 'program' in config else None
-        self.value_type = self.STATE
+        self.runner.ended(self)
+        if answer is None:
+            self.deferred.errback(IOError('launcher ended'))
+        elif answer['timeout']:
+            logging.warning('Killed %s, no result within %.1f seconds', self.program[0], self.timeout)
+            self.deferred.errback(ProcessTimeout(self.program[0]))
+        else:
+            self.deferred.callback((answer['status'], answer['output'].encode('latin-1'),
+                                    answer['errors'].encode('latin-1')))
 
-    def run(self):
+
+class LauncherProtocol(protocol.ProcessProtocol):
+    """
+    Talks to bin/tiny-dash-launcher.py, which runs programs for a ProcessRunner, so that
+    the dashboard process does not need to be forked for each program.
+    """
+
+    def __init__(self, runner):
+        self.runner = runner
+        self.buffer = ''
+        self.requests = {}
+        self.ids = itertools.count(1)
+
+    def launch(self, process):
+        """Ask the launcher to run the program of a RunProtocol."""
+        request_id = next(self.ids)
+        self.requests[request_id] = process
+        self.transport.write(json.dumps({'id': request_id,
+                                         'program': list(process.program),
+                                         'timeout': process.timeout}) + '\n')
+
+    def outReceived(self, data):
+        lines = (self.buffer + data).split('\n')
+        self.buffer = lines.pop()
+        for line in lines:
+            answer = json.loads(line)
+            if answer['id'] in self.requests:
+                self.requests.pop(answer['id']).launched(answer)
+
+    def errReceived(self, data):
+        logging.warning('Launcher: %s', data.rstrip())
+
+    def processEnded(self, reason):
+        logging.warning('Launcher ended, running programs directly: %s', reason.getErrorMessage())
+        self.runner.launcher = None
+        requests = self.requests
+        self.requests = {}
+        for process in requests.values():
+            process.launched(None)
+
+
+class ProcessRunner(object):
+    """
+    Runs the programs of sensors. Each program runs in a process group of its own when
+    possible, so that a program which does not finish in time can be killed together with its
+    children. Programs started when "max_children" programs are running wait for one of them
+    to end.
+
+    With a launcher, the programs are run by a small helper process instead of forking the
+    dashboard, see bin/tiny-dash-launcher.py. If the launcher dies, programs are run directly.
+    """
+    _shared = None
+
+    LAUNCHER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tiny-dash-launcher.py')
+
+    def __init__(self, max_children=0, launcher=None):
         """
-        Run the configured program and call the update() method with the first line printed by the program.
+        Constructor.
+
+        :param max_children: max number of programs running at the same time, 0 for no limit
+        :param launcher: path of the launcher script, None to run programs directly
         """
-        if not self.program:
-            self.update(-1)
+        self.max_children = max_children
+        self.running = set()
+        self.waiting = collections.deque()
+        self.setsid = find_executable('setsid')
+        self.launcher = None
+        if launcher:
+            self.start_launcher(launcher)
+
+    @classmethod
+    def shared(cls):
+        """
+        :return: the ProcessRunner shared by all sensors
+        """
+        if not cls._shared:
+            cls._shared = ProcessRunner()
+        return cls._shared
+
+    def start_launcher(self, launcher):
+        """Start the launcher script, falling back to running programs directly."""
+        if not os.path.exists(launcher):
+            logging.warning('No launcher %s, running programs directly', launcher)
             return
-        use_shell = not (isinstance(self.program, (list, tuple)))
-        logging.debug('Calling %s',
-                      self.program if use_shell else ' '.join(self.program))
-        d = utils.getProcessOutput(self.program[0], self.program[1:] if len(self.program) > 1 else [],
-                                   env=os.environ)
-        d.addCallbacks(self.got_output, self.no_output)
+        logging.debug('Starting launcher %s', launcher)
+        self.launcher = LauncherProtocol(self)
+        try:
+            reactor.spawnProcess(self.launcher, sys.executable, [sys.executable, launcher], env=os.environ)
+        except Exception as e:
+            logging.warning('Can not start launcher %s, running programs directly: %s', launcher, e)
+            self.launcher = None
 
-    def no_output(self, err):
-        logging.debug("Got %s", err)
-        self.update(-1)
+    def get_value(self, program, timeout=None):
+        """
+        Run a program.
 
-    def got_output(self, output):
-        result = output.split("\n")[0].strip() if output else ''
-        logging.debug("Got %s --> %s", output, result)
-        self.update(result)
+        :param program: the program and its arguments
+        :param timeout: seconds to wait for the program to end before killing it, None to wait forever
+        :return: a Deferred which fires with the exit status, -1 if the program was killed by a
+                 signal, or fails with ProcessTimeout
+        """
+        d = self.run(program, timeout)
+        d.addCallback(lambda (status, output, errors): -1 if status is None else status)
+        return d
+
+    def get_output(self, program, timeout=None):
+        """
+        Run a program.
+
+        :param program: the program and its arguments
+        :param timeout: seconds to wait for the program to end before killing it, None to wait forever
+        :return: a Deferred which fires with the output of the program, or fails with
+                 ProcessTimeout, or with IOError if the program printed anything on stderr
+        """
+        d = self.run(program, timeout)
+        d.addCallback(self._got_output)
+        return d
+
+    def _got_output(self, (status, output, errors)):
+        if errors:
+            raise IOError('got stderr: {!r}'.format(errors))
+        return output
+
+    def run(self, program, timeout=None):
+        """
+        Run a program.
+
+        :return: a Deferred which fires with (exit status, output, errors)
+        """
+        process = RunProtocol(self, program, timeout)
+        if self.max_children and len(self.running) >= self.max_children:
+            logging.debug('%d programs running, %s waits', len(self.running), program[0])
+            self.waiting.append(process)
+        else:
+            self._spawn(process)
+        return process.deferred
+
+    def _spawn(self, process):
+        if self.launcher:
+            self.running.add(process)
+            self.launcher.launch(process)
+            return
+        program = list(process.program)
+        if self.setsid:
+            program.insert(0, self.setsid)
+        self.running.add(process)
+        try:
+            reactor.spawnProcess(process, program[0], program, env=os.environ)
+        except Exception:
+            self.running.discard(process)
+            process.deferred.errback()
+
+    def ended(self, process):
+        self.running.discard(process)
+        while self.waiting and (not self.max_children or len(self.running) < self.max_children):
+            self._spawn(self.waiting.popleft())
+
+    def kill(self, transport):
+        """Kill a process, and its process group if it has one of its own."""
+        if transport.pid is None:
+            return
+        try:
+            if self.setsid:
+                os.killpg(transport.pid, signal.SIGKILL)
+                return
+        except OSError:
+            # Not yet a group leader
+            pass
+        try:
+            transport.signalProcess('KILL')
+        except (OSError, ProcessExitedAlready):
+            pass
 
 
-class FractionSensor(SensorBase):
+class ProgramSensor(SensorBase):
     """
-    Run a program which is expected to print a float value in the range 0.0..1.0.
+    Base class for sensors running the configured program. Normally the program is started for
+    each update, but with the "stream" setting it is started once and kept running:
+
+    * lines: the program prints a new value on a line whenever it likes
+    * poll: a newline is written to the program's stdin each update interval, and the program
+      is expected to answer with one line
+
+    A streaming program which dies is restarted, waiting longer for each failed attempt.
+    Other programs are killed when they have not finished within "timeout" seconds, and the
+    sensor is broken. So are polled programs which do not answer within "timeout" seconds.
     """
+    __slots__ = ('program', 'stream', 'timeout', 'process', 'restart', 'backoff', 'polling', 'poll_timer')
+
+    MIN_BACKOFF = 1.0
+    MAX_BACKOFF = 60.0
+
+    KEYS = SensorBase.KEYS + ('program', 'stream', 'timeout')
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(ProgramSensor, self).__init__(queue, config['update-interval'] if 'update-interval' in config else None)
+        self.program = config['program'] if 'program' in config else None
+        self.stream = config['stream'] if 'stream' in config else None
+        if self.stream is True:
+            self.stream = 'lines'
+        self.timeout = config['timeout'] if 'timeout' in config else 60.0
+        self.process = None
+        self.restart = None
+        self.backoff = self.MIN_BACKOFF
+        self.polling = False
+        self.poll_timer = None
+
+    def start(self):
+        """
+        Start updating the sensor. Streaming programs are started right away, and only
+        get timer updates in "poll" mode.
+        """
+        if self.stream and self.program:
+            self.spawn_stream()
+            if self.stream != 'poll':
+                return
+        super(ProgramSensor, self).start()
+
+    def stop(self):
+        """Stop updating the sensor, and the streaming program."""
+        super(ProgramSensor, self).stop()
+        if self.restart and self.restart.active():
+            self.restart.cancel()
+        self.cancel_poll_timer()
+        if self.process:
+            try:
+                self.process.signalProcess('TERM')
+            except (OSError, ProcessExitedAlready):
+                pass
+
+    def timeout_triggered(self):
+        """
+        Called when timer fires. Asks the streaming program for a new line, or calls the
+        run() method.
+        """
+        if self.stream and self.program:
+            self.poll_stream()
+        else:
+            super(ProgramSensor, self).timeout_triggered()
+
+    def parse_line(self, line):
+        """
+        Convert a line printed by a streaming program to a sensor result. Sub-classes override
+        this to match the value type.
+        """
+        return line
+
+    def spawn_stream(self):
+        """Start the streaming program."""
+        self.restart = None
+        logging.debug('Starting stream %s', ' '.join(self.program))
+        self.process = reactor.spawnProcess(StreamProtocol(self), self.program[0], self.program, env=os.environ)
+
+    def poll_stream(self):
+        """Ask the streaming program for a value by writing a newline to its stdin."""
+        if not self.process:
+            self.update(-1)
+            return
+        self.polling = True
+        if self.timeout:
+            self.poll_timer = reactor.callLater(self.timeout, self.poll_timed_out)
+        self.process.write('\n')
+
+    def poll_timed_out(self):
+        """Kill a streaming program which has not answered a poll in time, it is restarted later."""
+        logging.warning('Killing %s, no answer within %.1f seconds', self.program[0], self.timeout)
+        self.poll_timer = None
+        self.polling = False
+        try:
+            self.process.signalProcess('KILL')
+        except (OSError, ProcessExitedAlready):
+            pass
+        self.update(-1)
+
+    def cancel_poll_timer(self):
+        if self.poll_timer and self.poll_timer.active():
+            self.poll_timer.cancel()
+        self.poll_timer = None
+
+    def line_received(self, line):
+        """Called by the StreamProtocol for each line printed by the streaming program."""
+        self.backoff = self.MIN_BACKOFF
+        try:
+            result = self.parse_line(line)
+        except ValueError:
+            logging.debug('Bad stream output: %s', line)
+            result = -1
+        if self.polling:
+            self.polling = False
+            self.cancel_poll_timer()
+            self.update(result)
+        else:
+            self.publish(result)
+
+    def stream_ended(self, reason):
+        """Called when the streaming program has exited. Reports broken and restarts it later."""
+        logging.warning('Stream %s ended: %s', ' '.join(self.program), reason.getErrorMessage())
+        self.process = None
+        if self.polling:
+            self.polling = False
+            self.cancel_poll_timer()
+            self.update(-1)
+        else:
+            self.publish(-1)
+        if self.stopped:
+            return
+        self.restart = reactor.callLater(self.backoff, self.spawn_stream)
+        self.backoff = min(self.backoff * 2, self.MAX_BACKOFF)
+
+
+class StatusSensor(ProgramSensor):
+    """
+    Run a program and return the exit status during update.
+    """
+    __slots__ = ()
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(StatusSensor, self).__init__(queue, config)
+        self.value_type = self.STATUS
+
+    def run(self):
+        """
+        Run the configured program and call the update() method with the exit status.
+        """
+        if not self.program:
+            self.update(-1)
+            return
+        use_shell = not (isinstance(self.program, (list, tuple)))
+        logging.debug('Calling %s',
+                      self.program if use_shell else ' '.join(self.program))
+        d = ProcessRunner.shared().get_value(self.program, self.timeout)
+        d.addCallbacks(self.update, self.no_value)
+
+    def no_value(self, err):
+        logging.debug("Got %s", err)
+        self.update(-1)
+
+    def parse_line(self, line):
+        return int(line)
+
+
+class StateSensor(ProgramSensor):
+    """
+    Run a program and return the first line of output.
+    """
+    __slots__ = ()
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(StateSensor, self).__init__(queue, config)
+        self.value_type = self.STATE
+
+    def run(self):
+        """
+        Run the configured program and call the update() method with the first line printed by the program.
+        """
+        if not self.program:
+            self.update(-1)
+            return
+        use_shell = not (isinstance(self.program, (list, tuple)))
+        logging.debug('Calling %s',
+                      self.program if use_shell else ' '.join(self.program))
+        d = ProcessRunner.shared().get_output(self.program, self.timeout)
+        d.addCallbacks(self.got_output, self.no_output)
+
+    def no_output(self, err):
+        logging.debug("Got %s", err)
+        self.update(-1)
+
+    def got_output(self, output):
+        result = output.split("\n")[0].strip() if output else ''
+        logging.debug("Got %s --> %s", output, result)
+        self.update(result)
+
+    def parse_line(self, line):
+        return line.strip()
+
+
+class FractionSensor(ProgramSensor):
+    """
+    Run a program which is expected to print a float value in the range 0.0..1.0.
+    """
+    __slots__ = ()
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+        
+        :param queue: queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(FractionSensor, self).__init__(queue, config)
+        self.value_type = self.FRACTION
+
+    def run(self):
+        """
+        Run the configured program and expect a value in range 0.0..1.0. A negative value
+        represents a broken sensor.
+        """
+        if not self.program:
+            logging.debug("No program configured")
+            self.update(-1.0)
+            return
+        use_shell = not (isinstance(self.program, (list, tuple)))
+        logging.debug('Calling %s', self.program if use_shell else ' '.join(self.program))
+        d = ProcessRunner.shared().get_output(self.program, self.timeout)
+        d.addCallbacks(self.got_output, self.no_output)
+
+    def no_output(self, err):
+        logging.debug("Got %s", err)
+        self.update(-1.0)
+
+    def got_output(self, output):
+        try:
+            result_float = float(output)
+        except ValueError:
+            logging.debug('Bad output: %s', output)
+            self.update(-1.0)
+            return
+        logging.debug("Got %s --> %f", output, result_float)
+        self.update(result_float)
+
+    def parse_line(self, line):
+        return float(line)
+
+
+class CpuSensor(KeyedSensor, SensorBase):
+    """
+    Reads the CPU usage since the last update from /proc/stat, as a fraction. Indicators
+    select a CPU with the "cpu" setting, or show the total usage of all CPUs without it. One
+    read serves all CPUs.
+    """
+    __slots__ = ('previous', 'subscribers')
+
+    STAT = '/proc/stat'
+    KEY = 'cpu'
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(CpuSensor, self).__init__(queue, config['update-interval'] if 'update-interval' in config else None)
+        self.value_type = self.FRACTION
+        self.queues = []
+        self.subscribers = {}
+        self.subscribe(queue, config)
+        # (busy, total) time by CPU at the last update
+        self.previous = {}
+
+    def run(self):
+        try:
+            with open(self.STAT) as fp:
+                lines = [line.split() for line in fp if line.startswith('cpu')]
+        except (IOError, OSError) as e:
+            logging.debug('Failed to read %s: %s', self.STAT, e)
+            self.update(-1)
+            return
+        usage = {}
+        for fields in lines:
+            cpu = int(fields[0][3:]) if len(fields[0]) > 3 else None
+            times = [int(field) for field in fields[1:]]
+            total = sum(times[:8])
+            # idle and iowait
+            busy = total - sum(times[3:5])
+            last_busy, last_total = self.previous[cpu] if cpu in self.previous else (0, 0)
+            self.previous[cpu] = (busy, total)
+            usage[cpu] = float(busy - last_busy) / (total - last_total) if total > last_total else 0.0
+        # Unknown CPUs are broken
+        for cpu in self.subscribers:
+            usage.setdefault(cpu, -1)
+        self.update(usage)
+
+
+class MemorySensor(SensorBase):
+    """
+    Reads the fraction of memory in use from /proc/meminfo, or of swap with "memory: swap".
+    """
+    __slots__ = ('swap',)
+
+    MEMINFO = '/proc/meminfo'
+    KEYS = SensorBase.KEYS + ('memory',)
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(MemorySensor, self).__init__(queue,
+                                           config['update-interval'] if 'update-interval' in config else None)
+        self.swap = config['memory'] == 'swap' if 'memory' in config else False
+        self.value_type = self.FRACTION
+
+    def run(self):
+        try:
+            with open(self.MEMINFO) as fp:
+                info = dict((fields[0].rstrip(':'), int(fields[1])) for fields in (line.split() for line in fp))
+            if self.swap:
+                total = info['SwapTotal']
+                free = info['SwapFree']
+            else:
+                total = info['MemTotal']
+                free = info['MemAvailable'] if 'MemAvailable' in info else (info['MemFree'] + info['Buffers'] +
+                                                                            info['Cached'])
+        except (IOError, OSError, KeyError, IndexError, ValueError) as e:
+            logging.debug('Failed to read %s: %s', self.MEMINFO, e)
+            self.update(-1)
+            return
+        self.update(1.0 - float(free) / total if total else 0.0)
+
+
+class LoadSensor(SensorBase):
+    """
+    Reads the load average from /proc/loadavg, as a fraction of the number of CPUs. The
+    "load-period" setting selects the 1 (default), 5 or 15 minute average.
+    """
+    __slots__ = ('cpus', 'field')
+
+    LOADAVG = '/proc/loadavg'
+    PERIODS = {1: 0, 5: 1, 15: 2}
+    KEYS = SensorBase.KEYS + ('load-period',)
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(LoadSensor, self).__init__(queue, config['update-interval'] if 'update-interval' in config else None)
+        period = config['load-period'] if 'load-period' in config else 1
+        self.field = self.PERIODS[period] if period in self.PERIODS else None
+        self.cpus = multiprocessing.cpu_count()
+        self.value_type = self.FRACTION
+
+    def run(self):
+        if self.field is None:
+            self.update(-1)
+            return
+        try:
+            with open(self.LOADAVG) as fp:
+                load = float(fp.read().split()[self.field])
+        except (IOError, OSError, IndexError, ValueError) as e:
+            logging.debug('Failed to read %s: %s', self.LOADAVG, e)
+            self.update(-1)
+            return
+        self.update(load / self.cpus)
+
+
+class DiskSensor(SensorBase):
+    """
+    Reads the fraction of disk space in use on the file system of "path", like df does.
+    """
+    __slots__ = ('path',)
+
+    KEYS = SensorBase.KEYS + ('path',)
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(DiskSensor, self).__init__(queue, config['update-interval'] if 'update-interval' in config else None)
+        self.path = config['path'] if 'path' in config else '/'
+        self.value_type = self.FRACTION
+
+    def run(self):
+        try:
+            fs = os.statvfs(self.path)
+        except (AttributeError, OSError) as e:
+            logging.debug('Failed to stat %s: %s', self.path, e)
+            self.update(-1)
+            return
+        used = fs.f_blocks - fs.f_bfree
+        available = used + fs.f_bavail
+        self.update(float(used) / available if available else 0.0)
+
+
+class BatchSensor(KeyedSensor, ProgramSensor):
+    """
+    Run a program which prints the values for many indicators, either as lines with a key and
+    a value separated by whitespace, or as a JSON object.
+    """
+    __slots__ = ('subscribers',)
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(BatchSensor, self).__init__(queue, config)
+        self.queues = []
+        self.subscribers = {}
+        self.subscribe(queue, config)
+
+    def run(self):
+        """
+        Run the configured program and call the update() method with the values by key.
+        """
+        if not self.program:
+            self.update(-1)
+            return
+        logging.debug('Calling %s', ' '.join(self.program))
+        d = ProcessRunner.shared().get_output(self.program, self.timeout)
+        d.addCallbacks(self.got_output, self.no_output)
+
+    def no_output(self, err):
+        logging.debug("Got %s", err)
+        self.update(-1)
+
+    def got_output(self, output):
+        try:
+            if output.lstrip().startswith('{'):
+                values = json.loads(output)
+            else:
+                values = {}
+                for line in output.splitlines():
+                    if line.strip():
+                        values.update(self.parse_line(line))
+        except ValueError:
+            values = None
+        if not isinstance(values, dict):
+            logging.debug('Bad batch output: %s', output)
+            self.update(-1)
+            return
+        # Keys not printed are broken
+        for key in self.subscribers:
+            values.setdefault(key, -1)
+        self.update(values)
+
+    def parse_line(self, line):
+        fields = line.split(None, 1)
+        if len(fields) != 2:
+            raise ValueError(line)
+        return {fields[0]: fields[1].strip()}
+
+
+class ListenerProtocol(protocol.DatagramProtocol):
+    """
+    Receives statsd style datagrams, "name:value|type", one or more per datagram separated
+    by newlines, and hands the values to a ListenerSensor.
+    """
+
+    def __init__(self, sensor):
+        self.sensor = sensor
+
+    def datagramReceived(self, data, address=None):
+        values = {}
+        for line in data.splitlines():
+            name, separator, value = line.partition(':')
+            if not separator:
+                logging.debug('Bad datagram: %s', line)
+                continue
+            values[name.strip()] = value.split('|', 1)[0].strip()
+        if values:
+            self.sensor.publish(values)
+
+
+class ListenerSensor(KeyedSensor, SensorBase):
+    """
+    Listens for values sent to a local UDP "port" or UNIX datagram "socket", instead of polling.
+    Each indicator selects the name of the value to show with the "key" setting.
+    """
+    __slots__ = ('port', 'socket', 'listener', 'subscribers')
+
+    KEYS = ('port', 'socket')
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(ListenerSensor, self).__init__(queue)
+        self.port = config['port'] if 'port' in config else None
+        self.socket = config['socket'] if 'socket' in config else None
+        self.listener = None
+        self.queues = []
+        self.subscribers = {}
+        self.subscribe(queue, config)
+
+    def start(self):
+        """Start listening."""
+        try:
+            if self.socket:
+                # Remove the socket left by an earlier run
+                if os.path.exists(self.socket) and stat.S_ISSOCK(os.stat(self.socket).st_mode):
+                    os.remove(self.socket)
+                self.listener = reactor.listenUNIXDatagram(self.socket, ListenerProtocol(self))
+            elif self.port:
+                self.listener = reactor.listenUDP(self.port, ListenerProtocol(self), interface='127.0.0.1')
+            else:
+                logging.error('Listener sensor without port or socket')
+                self.publish(-1)
+        except (CannotListenError, OSError) as e:
+            logging.error('Failed to listen: %s', e)
+            self.publish(-1)
+
+    def stop(self):
+        """Stop listening."""
+        super(ListenerSensor, self).stop()
+        if self.listener:
+            self.listener.stopListening()
+            self.listener = None
+
+
+class FileWatcher(object):
+    """
+    Watches files with inotify. The directories of the files are watched, so files can be
+    created and removed, with one watch per directory shared by all files in it.
+    """
+    MASK = (inotify.IN_CREATE | inotify.IN_DELETE | inotify.IN_MODIFY | inotify.IN_ATTRIB | inotify.IN_MOVED_FROM |
+            inotify.IN_MOVED_TO) if inotify else 0
+    _shared = None
+
+    def __init__(self):
+        self.notifier = inotify.INotify()
+        self.notifier.startReading()
+        # Callbacks by file name by directory
+        self.directories = {}
+
+    @classmethod
+    def shared(cls):
+        """
+        :return: the FileWatcher shared by all sensors, or None if inotify is not supported
+        """
+        if not cls._shared and inotify:
+            try:
+                cls._shared = FileWatcher()
+            except (inotify.INotifyError, OSError) as e:
+                logging.debug('No inotify: %s', e)
+        return cls._shared
+
+    def watch(self, path, callback):
+        """
+        Call callback() each time a file changes.
+
+        :param path: path of the file, which need not exist
+        :param callback: function to call
+        :raise inotify.INotifyError: if the directory of the file can not be watched
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        if directory not in self.directories:
+            self.notifier.watch(FilePath(directory), mask=self.MASK, callbacks=[self.notify])
+            self.directories[directory] = {}
+        self.directories[directory].setdefault(name, []).append(callback)
+
+    def unwatch(self, path, callback):
+        """
+        Stop calling callback() when a file changes.
+
+        :param path: path given to watch()
+        :param callback: function given to watch()
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        files = self.directories[directory]
+        files[name].remove(callback)
+        if not files[name]:
+            del files[name]
+        if not files:
+            self.notifier.ignore(FilePath(directory))
+            del self.directories[directory]
+
+    def notify(self, ignored, filepath, mask):
+        files = self.directories.get(filepath.dirname(), {})
+        for callback in files.get(filepath.basename(), ()):
+            callback()
+
+
+class FileSensor(SensorBase):
+    """
+    Watches the file at "path", and updates when it changes. The "value-type" setting selects
+    what is shown:
+
+    * Status: whether the file exists (default)
+    * State: the first line of the file
+    * Fraction: the file contains a fraction
+
+    Files are watched with inotify where supported, and otherwise read every update interval.
+    """
+    __slots__ = ('path', 'last', 'watcher')
+
+    KEYS = SensorBase.KEYS + ('path', 'value-type')
+
+    def __init__(self, queue, config):
+        """
+        Constructor.
+
+        :param queue: the queue to put data in
+        :param config: the sensor configuration dict
+        """
+        super(FileSensor, self).__init__(queue, config['update-interval'] if 'update-interval' in config else None)
+        self.path = config['path'] if 'path' in config else None
+        value_type = config['value-type'] if 'value-type' in config else 'Status'
+        self.value_type = VALUE_TYPES[value_type] if value_type in VALUE_TYPES else None
+        self.last = None
+        self.watcher = None
+
+    def start(self):
+        """Start watching the file, or polling it if it can not be watched."""
+        watcher = FileWatcher.shared() if self.path and self.value_type else None
+        if watcher:
+            try:
+                watcher.watch(self.path, self.changed)
+            except (inotify.INotifyError, OSError) as e:
+                logging.warning('Can not watch %s, polling instead: %s', self.path, e)
+            else:
+                self.watcher = watcher
+                self.changed()
+                return
+        super(FileSensor, self).start()
+
+    def stop(self):
+        super(FileSensor, self).stop()
+        if self.watcher:
+            self.watcher.unwatch(self.path, self.changed)
+            self.watcher = None
+
+    def run(self):
+        self.update(self.read())
+
+    def changed(self):
+        result = self.read()
+        if result != self.last:
+            self.last = result
+            self.publish(result)
+
+    def read(self):
+        """
+        :return: the current sensor result
+        """
+        if not self.path or not self.value_type:
+            return -1
+        if self.value_type == self.STATUS:
+            return 0 if os.path.exists(self.path) else 1
+        try:
+            with open(self.path) as fp:
+                content = fp.read()
+        except (IOError, OSError):
+            return -1
+        if self.value_type == self.STATE:
+            return content.split('\n')[0].strip()
+        try:
+            return float(content)
+        except ValueError:
+            return -1
+
+
+class HttpClient(object):
+    """
+    Asynchronous HTTP client. Connections are kept alive and reused per host, so sensors
+    polling the same server share connections instead of opening new ones.
+    """
+    _shared = None
+
+    def __init__(self, max_per_host=2):
+        """
+        Constructor.
+
+        :param max_per_host: max number of idle connections to keep per host
+        """
+        self.pool = HTTPConnectionPool(reactor, persistent=True)
+        self.pool.maxPersistentPerHost = max_per_host
+        self.agent = Agent(reactor, pool=self.pool)
+
+    @classmethod
+    def shared(cls):
+        """
+        :return: the HttpClient shared by all sensors
+        """
+        if not cls._shared:
+            cls._shared = HttpClient()
+        return cls._shared
+
+    def get_json(self, url, timeout):
+        """
+        Fetch and decode a JSON document.
+
+        :param url: URL to fetch
+        :param timeout: seconds to wait for the complete response before giving up
+        :return: a Deferred which fires with the decoded data
+        """
+        d = self.agent.request('GET', url, Headers({'Accept': ['application/json']}))
+        d.addCallback(self._got_response)
+        d.addCallback(json.loads)
+        d.addTimeout(timeout, reactor)
+        return d
+
+    def _got_response(self, response):
+        if response.code != 200:
+            response.deliverBody(protocol.Protocol())
+            raise web_error.Error(response.code)
+        return readBody(response)
+
+
+class JenkinsServer(object):
+    """
+    Polls the state of all jobs on a Jenkins server, or in a Jenkins folder, with a single
+    request and hands the states to the JenkinsJobStateSensors monitoring the jobs. The
+    polling cost is thereby per server instead of per job.
+    """
+    TREE = 'jobs[name,lastBuild[building,result]]'
+
+    # Known servers, by URL
+    servers = {}
+
+    def __init__(self, url):
+        """
+        Constructor. Use get() to find the server for a job URL instead.
 
-    def __init__(self, queue, config):
+        :param url: URL of the server or folder containing the jobs
         """
-        Constructor.
-        
-        :param queue: queue to put data in
-        :param config: the sensor configuration dict
+        self.url = url
+        self.jobs = {}
+        self.update_interval = None
+        self.timeout = None
+        self.started = False
+        self.stats = SensorStats()
+
+    @classmethod
+    def get(cls, job_url):
         """
-        super(FractionSensor, self).__init__(queue, config['update-interval'] if 'update-interval' in config else None)
-        self.program = config['program'] if 'program' in config else None
-        self.value_type = self.FRACTION
+        Find the server for a job.
 
-    def run(self):
+        :param job_url: URL of a job, <server>/job/<name>
+        :return: (server, job name), or (None, None) if the URL does not look like a job URL
         """
-        Run the configured program and expect a value in range 0.0..1.0. A negative value
-        represents a broken sensor.
+        if '/job/' not in job_url:
+            return None, None
+        url, name = job_url.rstrip('/').rsplit('/job/', 1)
+        if not name:
+            return None, None
+        if url not in cls.servers:
+            cls.servers[url] = JenkinsServer(url)
+        return cls.servers[url], urllib.unquote(name)
+
+    @property
+    def suspended(self):
+        """Whether all sensors of the server are suspended."""
+        return all(sensor.suspended for sensors in self.jobs.values() for sensor in sensors)
+
+    def subscribe(self, sensor, job):
         """
-        if not self.program:
-            logging.debug("No program configured")
-            self.update(-1.0)
-            return
-        use_shell = not (isinstance(self.program, (list, tuple)))
-        logging.debug('Calling %s', self.program if use_shell else ' '.join(self.program))
-        d = utils.getProcessOutput(self.program[0], self.program[1:] if len(self.program) > 1 else [], env=os.environ)
-        d.addCallbacks(self.got_output, self.no_output)
+        Start delivering states of a job to a sensor. The server is polled as often as the
+        most eager sensor wants.
 
-    def no_output(self, err):
-        logging.debug("Got %s", err)
-        self.update(-1.0)
+        :param sensor: a JenkinsJobStateSensor
+        :param job: name of the job
+        """
+        self.jobs.setdefault(job, []).append(sensor)
+        if not self.update_interval or sensor.update_interval < self.update_interval:
+            self.update_interval = sensor.update_interval
+        if not self.timeout or sensor.timeout > self.timeout:
+            self.timeout = sensor.timeout
+        if not self.started:
+            self.started = True
+            SensorBase.scheduler.start(self)
+
+    def unsubscribe(self, sensor):
+        """
+        Stop delivering states to a sensor. The server is no longer polled when it has no
+        sensors left.
 
-    def got_output(self, output):
-        result_float = float(output)
-        logging.debug("Got %s --> %f", output, result_float)
-        self.update(result_float)
+        :param sensor: a sensor given to subscribe()
+        """
+        for job, sensors in self.jobs.items():
+            if sensor in sensors:
+                sensors.remove(sensor)
+            if not sensors:
+                del self.jobs[job]
+        if not self.jobs:
+            SensorBase.scheduler.cancel(self)
+            self.started = False
+            self.update_interval = None
+            self.timeout = None
+            del self.servers[self.url]
+
+    def timeout_triggered(self):
+        logging.debug('Fetching Jenkins jobs from URL: %s/api/json', self.url)
+        d = HttpClient.shared().get_json('{}/api/json?tree={}'.format(self.url, urllib.quote(self.TREE, ',')),
+                                            self.timeout)
+        d.addCallbacks(self.got_data, self.no_data)
+
+    def no_data(self, err):
+        logging.debug('Got %s', err)
+        self.update({})
+
+    def got_data(self, data):
+        states = {}
+        try:
+            for job in data['jobs']:
+                build = job.get('lastBuild')
+                if build:
+                    states[job['name']] = 'BUILDING' if build['building'] else build['result']
+        except (KeyError, TypeError):
+            logging.debug('Bad Jenkins data from %s: %s', self.url, data)
+        self.update(states)
+
+    def update(self, states):
+        """
+        Hand job states to the sensors and schedule the next poll.
+
+        :param states: dict with job name as key and state as value. Missing jobs are broken.
+        """
+        for job, sensors in self.jobs.items():
+            for sensor in sensors:
+                sensor.publish(states[job] if job in states else -1)
+        SensorBase.scheduler.finished(self)
+        if self.started:
+            SensorBase.scheduler.schedule(self, self.update_interval)
 
 
 class JenkinsJobStateSensor(SensorBase):
     """
-    Monitors status of Jenkins jobs.
+    Monitors status of Jenkins jobs. Jobs on the same server are polled together by a
+    JenkinsServer.
     """
+    __slots__ = ('url', 'timeout', 'server')
+
+    KEYS = SensorBase.KEYS + ('url', 'timeout')
 
     def __init__(self, queue, config):
         super(JenkinsJobStateSensor, self).__init__(queue,
                                                     config['update-interval'] if 'update-interval' in config else None)
         self.url = config['url'] if 'url' in config else None
+        self.timeout = config['timeout'] if 'timeout' in config else 10.0
         self.value_type = self.STATE
+        self.server = None
 
-    def run(self):
-        if self.url:
-            try:
-                logging.debug('Fetching Jenkins data from URL: %s/lastBuild/api/json', self.url)
-                data = json.loads(urllib2.urlopen('{}/lastBuild/api/json'.format(self.url)).read())
-                state = 'BUILDING' if data['building'] else data['result']
-            except:
-                state = -1
+    def start(self):
+        server, job = JenkinsServer.get(self.url) if self.url else (None, None)
+        if server:
+            server.subscribe(self, job)
+        else:
+            super(JenkinsJobStateSensor, self).start()
+        self.server = server
+
+    def stop(self):
+        if self.server:
+            self.server.unsubscribe(self)
         else:
+            super(JenkinsJobStateSensor, self).stop()
+
+    def resume(self):
+        self.scheduler.run_now(self.server or self)
+
+    def run(self):
+        if not self.url:
+            self.update(-1)
+            return
+        logging.debug('Fetching Jenkins data from URL: %s/lastBuild/api/json', self.url)
+        d = HttpClient.shared().get_json('{}/lastBuild/api/json'.format(self.url), self.timeout)
+        d.addCallbacks(self.got_data, self.no_data)
+
+    def no_data(self, err):
+        logging.debug('Got %s', err)
+        self.update(-1)
+
+    def got_data(self, data):
+        try:
+            state = 'BUILDING' if data['building'] else data['result']
+        except (KeyError, TypeError):
             state = -1
         self.update(state)
 
 
-class Lamp(object):
-    def __init__(self, parent, queue, config):
-        self.queue = queue
-        self.width = config['width'] if 'width' in config else 100
-        self.height = config['height'] if 'height' in config else 100
+# Sensor classes by name, for the "sensor" setting
+SENSORS = {'Status': StatusSensor,
+           'State': StateSensor,
+           'Fraction': FractionSensor,
+           'JenkinsJobState': JenkinsJobStateSensor,
+           'Batch': BatchSensor,
+           'Cpu': CpuSensor,
+           'Memory': MemorySensor,
+           'Load': LoadSensor,
+           'Disk': DiskSensor,
+           'Listener': ListenerSensor,
+           'File': FileSensor}
+
+
+# Stipple pattern of indicators showing values from an earlier run
+STALE_STIPPLE = 'gray50'
+
+
+class LampStyle(object):
+    """
+    The settings of a lamp which do not depend on its size. Lamps with the same settings
+    share a style, see get().
+    """
+    __slots__ = ('radius', 'on_color', 'off_color', 'broken_color', 'default_color', 'state_colors', 'shape',
+                 'shader')
+
+    # Shared styles, by settings
+    styles = {}
+
+    SETTINGS = ('radius', 'on-color', 'off-color', 'min-color', 'max-color', 'broken-color', 'default-color',
+                'state-colors', 'shape', 'color-steps')
+
+    def __init__(self, parent, config):
         self.radius = config['radius'] if 'radius' in config else 1.0
         self.on_color = config['on-color'] if 'on-color' in config else '#80ff80'
         self.off_color = config['off-color'] if 'off-color' in config else '#ff0000'
-        self.min_color = config['min-color'] if 'min-color' in config else 'green'
-        self.max_color = config['max-color'] if 'max-color' in config else 'red'
+        min_color = config['min-color'] if 'min-color' in config else 'green'
+        max_color = config['max-color'] if 'max-color' in config else 'red'
         self.broken_color = config['broken-color'] if 'broken-color' in config else '#000000'
         self.default_color = config['default-color'] if 'default-color' in config else self.broken_color
         self.state_colors = config['state-colors'] if 'state-colors' in config else {}
         self.shape = config['shape'] if 'shape' in config else 'round'
-        self.widget = Canvas(parent, height=self.height, width=self.width)
+        color_steps = config['color-steps'] if 'color-steps' in config else 256
+        self.shader = ColorShade.get(parent.winfo_rgb(min_color), parent.winfo_rgb(max_color), color_steps)
 
-        self.shader = ColorShade(parent.winfo_rgb(self.min_color), parent.winfo_rgb(self.max_color))
+    @classmethod
+    def get(cls, parent, config):
+        """
+        Get a shared style.
+
+        :param parent: the surface, for color lookups
+        :param config: the indicator configuration dict
+        :return: a LampStyle
+        """
+        key = tuple(freeze(config[name]) if name in config else None for name in cls.SETTINGS)
+        if key not in cls.styles:
+            cls.styles[key] = cls(parent, config)
+        return cls.styles[key]
+
+
+class Lamp(object):
+    __slots__ = ('queue', 'width', 'height', 'style', 'widget', 'tag', 'bulb', 'color', 'stale')
+
+    def __init__(self, parent, queue, config):
+        self.queue = queue
+        self.width = config['width'] if 'width' in config else 100
+        self.height = config['height'] if 'height' in config else 100
+        self.style = LampStyle.get(parent, config)
+        self.widget, self.tag = parent.new_canvas(self.width, self.height)
+
+        # The bulb is created once, and only changes color
+        margin = 1 + (self.width - self.width * self.style.radius) / 2
+        create = self.widget.create_rectangle if self.style.shape == 'square' else self.widget.create_oval
+        self.bulb = create(margin, margin, self.width - margin, self.height - margin, state=HIDDEN, tags=self.tag)
+        self.color = None
+        self.stale = False
 
     def update(self):
         try:
@@ -263,70 +2083,110 @@ class Lamp(object):
         except Queue.Empty:
             return
         logging.debug('Got sensor data %s', str(data['result']))
+        style = self.style
 
         if data['value-type'] == SensorBase.FRACTION:
             fraction = data['result']
             if fraction < 0.0:
-                logging.debug('Light is broken: %d => %s', fraction, self.broken_color)
-                color = self.broken_color
+                logging.debug('Light is broken: %d => %s', fraction, style.broken_color)
+                color = style.broken_color
             else:
                 if fraction > 1.0:
                     fraction = 1.0
                 logging.debug('Light is on by: %f', fraction)
-                color = self.shader.shade(fraction)
+                color = style.shader.shade(fraction)
         elif data['value-type'] == SensorBase.STATE:
             state = str(data['result'])
-            if state not in self.state_colors:
-                logging.debug('Unknown light state: %s => %s', state, self.default_color)
-                color = self.broken_color
+            if state not in style.state_colors:
+                logging.debug('Unknown light state: %s => %s', state, style.default_color)
+                color = style.broken_color
             else:
-                logging.debug('Light is on: %s => %s', state, self.state_colors[state])
-                color = self.state_colors[state]
+                logging.debug('Light is on: %s => %s', state, style.state_colors[state])
+                color = style.state_colors[state]
         else:
             status = data['result']
             if int(status) < 0:
-                logging.debug('Light is broken: %d => %s', status, self.broken_color)
-                color = self.broken_color
+                logging.debug('Light is broken: %d => %s', status, style.broken_color)
+                color = style.broken_color
             elif int(status) > 0:
                 logging.debug('Light is off: %d', status)
-                color = self.off_color
+                color = style.off_color
             else:
                 logging.debug('Light is on: %d', status)
-                color = self.on_color
+                color = style.on_color
 
-        self.draw(color)
+        self.draw(color, 'stale' in data and data['stale'])
 
-    def draw(self, color):
-        self.widget.delete('all')
-        margin = 1 + (self.width - self.width * self.radius) / 2
-        if self.shape == 'square':
-            self.widget.create_rectangle(margin, margin, self.width - margin, self.height - margin, fill=color)
-        else:
-            self.widget.create_oval(margin, margin, self.width - margin, self.height - margin, fill=color)
+    def draw(self, color, stale=False):
+        if color == self.color and stale == self.stale:
+            return
+        self.color = color
+        self.stale = stale
+        self.widget.itemconfigure(self.bulb, fill=color, stipple=STALE_STIPPLE if stale else '', state=NORMAL)
 
 
-class Meter(object):
+class MeterStyle(object):
     """
-    A meter type emitter which can be configured as a pie or arc and change color.
+    The settings of a meter which do not depend on its size. Meters with the same settings
+    share a style, see get().
     """
+    __slots__ = ('broken_color', 'start_angle', 'max_angle', 'thickness', 'shader')
 
-    def __init__(self, parent, queue, config):
-        self.queue = queue
-        self.width = config['width'] if 'width' in config else 100
-        self.height = config['height'] if 'height' in config else 100
-        self.min_color = config['min-color'] if 'min-color' in config else '#00ff00'
-        self.max_color = config['max-color'] if 'max-color' in config else '#ff0000'
+    # Shared styles, by settings
+    styles = {}
+
+    SETTINGS = ('min-color', 'max-color', 'broken-color', 'start-angle', 'end-angle', 'max-angle', 'thickness',
+                'color-steps')
+
+    def __init__(self, parent, config):
+        min_color = config['min-color'] if 'min-color' in config else '#00ff00'
+        max_color = config['max-color'] if 'max-color' in config else '#ff0000'
         self.broken_color = config['broken-color'] if 'broken-color' in config else '#000000'
         self.start_angle = config['start-angle'] if 'start-angle' in config else 270.0
         self.max_angle = config['end-angle'] if 'end-angle' in config else 360.0
         self.max_angle = config['max-angle'] if 'max-angle' in config else 360.0
         self.thickness = config['thickness'] if 'thickness' in config else 0.5
+        color_steps = config['color-steps'] if 'color-steps' in config else 256
+        self.shader = ColorShade.get(parent.winfo_rgb(min_color), parent.winfo_rgb(max_color), color_steps)
+
+    @classmethod
+    def get(cls, parent, config):
+        """
+        Get a shared style.
+
+        :param parent: the surface, for color lookups
+        :param config: the indicator configuration dict
+        :return: a MeterStyle
+        """
+        key = tuple(freeze(config[name]) if name in config else None for name in cls.SETTINGS)
+        if key not in cls.styles:
+            cls.styles[key] = cls(parent, config)
+        return cls.styles[key]
+
+
+class Meter(object):
+    """
+    A meter type emitter which can be configured as a pie or arc and change color.
+    """
+    __slots__ = ('queue', 'width', 'height', 'style', 'widget', 'tag', 'arc', 'color', 'extent', 'stale')
 
-        self.widget = Canvas(parent, height=self.height, width=self.width)
+    def __init__(self, parent, queue, config):
+        self.queue = queue
+        self.width = config['width'] if 'width' in config else 100
+        self.height = config['height'] if 'height' in config else 100
+        self.style = MeterStyle.get(parent, config)
 
-        # Maintain a color diff list to make calculation easier
+        self.widget, self.tag = parent.new_canvas(self.width, self.height)
 
-        self.shader = ColorShade(parent.winfo_rgb(self.min_color), parent.winfo_rgb(self.max_color))
+        # The arc is created once, and only changes color and extent
+        edgesize = self.width * self.style.thickness * 0.5
+        margin = 1 + edgesize / 2
+        self.arc = self.widget.create_arc(margin, margin, self.width - margin, self.height - margin,
+                                          start=self.style.start_angle, style="arc", width=edgesize, state=HIDDEN,
+                                          tags=self.tag)
+        self.color = None
+        self.extent = None
+        self.stale = False
 
     def update(self):
         try:
@@ -335,30 +2195,35 @@ class Meter(object):
         except Queue.Empty:
             return
         logging.debug('Got sensor data %f', status)
+        style = self.style
         if status < 0.0:
-            logging.debug('Sensor is broken: %f => %s', status, self.broken_color)
-            color = self.broken_color
+            logging.debug('Sensor is broken: %f => %s', status, style.broken_color)
+            color = style.broken_color
             status = 0.5
         else:
             if status > 1.0:
                 status = 1.0
-            color = self.shader.shade(status)
-        start_angle = self.start_angle
-        end_angle = -self.max_angle * status
-        logging.debug('Meter settings: %s, %f, %f', color, start_angle, end_angle)
-        edgesize = self.width * self.thickness * 0.5
-        margin = 1 + edgesize / 2
-        self.widget.delete('all')
-        self.widget.create_arc(margin, margin, self.width - margin, self.height - margin, start=start_angle,
-                               extent=end_angle, outline=color, style="arc", width=edgesize)
+            color = style.shader.shade(status)
+        end_angle = -style.max_angle * status
+        stale = 'stale' in data and data['stale']
+        logging.debug('Meter settings: %s, %f, %f', color, style.start_angle, end_angle)
+        if color == self.color and end_angle == self.extent and stale == self.stale:
+            return
+        self.color = color
+        self.extent = end_angle
+        self.stale = stale
+        self.widget.itemconfigure(self.arc, extent=end_angle, outline=color,
+                                  outlinestipple=STALE_STIPPLE if stale else '', state=NORMAL)
 
 
 class Broken(object):
+    __slots__ = ('queue', 'width', 'height', 'widget', 'tag')
+
     def __init__(self, parent, queue, config):
         self.queue = queue
         self.width = config['width'] if 'width' in config else 100
         self.height = config['height'] if 'height' in config else 100
-        self.widget = Canvas(parent, height=self.height, width=self.width)
+        self.widget, self.tag = parent.new_canvas(self.width, self.height)
         self.draw()
 
     def update(self):
@@ -369,22 +2234,23 @@ class Broken(object):
         logging.debug('Got sensor data %s', str(data['result']))
 
     def draw(self):
-        self.widget.delete('all')
         x0 = int(0.1 * float(self.width))
         w = self.width - int(0.1 * float(self.width))
         y0 = int(0.1 * float(self.height))
         h = self.height - int(0.1 * float(self.height))
-        self.widget.create_line(x0, y0, w, h, fill='red', width=4)
-        self.widget.create_line(w, y0, x0, h, fill='red', width=4)
+        self.widget.create_line(x0, y0, w, h, fill='red', width=4, tags=self.tag)
+        self.widget.create_line(w, y0, x0, h, fill='red', width=4, tags=self.tag)
 
 
 class Space(object):
     """Creates an empty space on the dashboard"""
+    __slots__ = ('width', 'height', 'widget')
+
     def __init__(self, parent, config):
         """
         Constructor. The value of the "space" entry in the "config" dict may contain a string: <int>x<int>, which will
         then be interpreted as WIDTHxHEIGHT and override any other width/height settings in the config.
-        :param parent: Tkinter widget
+        :param parent: surface to draw on
         :param config: configuration dict
         """
         if config['space'] and re.match('^\d+x\d+$', str(config['space'])):
@@ -394,11 +2260,181 @@ class Space(object):
         else:
             self.width = config['width'] if 'width' in config else 40
             self.height = config['height'] if 'height' in config else 40
-        self.widget = Frame(parent, height=self.height, width=self.width)
+        self.widget = parent.new_frame(self.width, self.height)
 
     def update(self):
         pass
 
+
+# Indicator classes by name, for the "type" setting
+INDICATORS = {'Lamp': Lamp,
+              'Meter': Meter,
+              'Broken': Broken}
+
+
+class WidgetSurface(object):
+    """
+    Gives each indicator a canvas of its own, placed in the dashboard frame.
+    """
+
+    def __init__(self, frame, status_text, describe=None):
+        """
+        Constructor.
+
+        :param frame: the dashboard frame
+        :param status_text: StringVar to show indicator names in
+        :param describe: function(emitter, name) returning the text to show for an emitter,
+                         None to show the name
+        """
+        self.frame = frame
+        self.status_text = status_text
+        self.describe = describe if describe else lambda emitter, name: name
+
+    def winfo_rgb(self, color):
+        return self.frame.winfo_rgb(color)
+
+    def new_canvas(self, width, height):
+        """
+        Create a canvas for an indicator.
+
+        :return: (canvas, tag) where tag shall be given to all items the indicator creates
+        """
+        return Canvas(self.frame, height=height, width=width), None
+
+    def new_frame(self, width, height):
+        """
+        Create an empty area for an indicator.
+
+        :return: the widget, or None if not needed
+        """
+        return Frame(self.frame, height=height, width=width)
+
+    def place(self, emitter, x, y):
+        emitter.widget.place(x=x, y=y)
+
+    def remove(self, emitter):
+        emitter.widget.destroy()
+
+    def set_name(self, emitter, name):
+        """Show name in the status bar when the mouse is over the emitter."""
+        emitter.widget.bind('<Enter>', lambda event: self.status_text.set(self.describe(emitter, name)))
+        emitter.widget.bind('<Leave>', lambda event: self.status_text.set(''))
+
+
+class CanvasSurface(object):
+    """
+    Draws all indicators as items on one shared canvas, which scales much better than one
+    widget per indicator. The indicator under the mouse is found through a grid of cells
+    instead of by binding events to each indicator.
+    """
+    # Grid cell size in pixels
+    CELL = 64
+
+    def __init__(self, frame, status_text, describe=None):
+        """
+        Constructor.
+
+        :param frame: the dashboard frame
+        :param status_text: StringVar to show indicator names in
+        :param describe: function(emitter, name) returning the text to show for an emitter,
+                         None to show the name
+        """
+        self.status_text = status_text
+        self.describe = describe if describe else lambda emitter, name: name
+        self.canvas = Canvas(frame, highlightthickness=0)
+        self.canvas.pack(fill=BOTH, expand=1)
+        self.canvas.bind('<Motion>', self.motion)
+        self.canvas.bind('<Leave>', lambda event: self.show(''))
+        self.tags = 0
+        self.names = {}
+        self.positions = {}
+        self.grid = {}
+        # The emitter under the mouse, and the text shown for it
+        self.hovered = None
+        self.shown = ''
+
+    def winfo_rgb(self, color):
+        return self.canvas.winfo_rgb(color)
+
+    def new_canvas(self, width, height):
+        """
+        :return: (canvas, tag) where tag shall be given to all items the indicator creates
+        """
+        self.tags += 1
+        return self.canvas, 'i{}'.format(self.tags)
+
+    def new_frame(self, width, height):
+        return None
+
+    def place(self, emitter, x, y):
+        """Move the items of an emitter, which are created at (0, 0), to a new position."""
+        old_x, old_y = self.positions[emitter] if emitter in self.positions else (0, 0)
+        if emitter.widget is not None:
+            self.canvas.move(emitter.tag, x - old_x, y - old_y)
+        self._unindex(emitter)
+        self.positions[emitter] = (x, y)
+        self._index(emitter)
+
+    def set_name(self, emitter, name):
+        self._unindex(emitter)
+        self.names[emitter] = name
+        self._index(emitter)
+
+    def remove(self, emitter):
+        """Delete the items of an emitter."""
+        if emitter.widget is not None:
+            self.canvas.delete(emitter.tag)
+        self._unindex(emitter)
+        self.names.pop(emitter, None)
+        if emitter is self.hovered:
+            self.hovered = None
+            self.show('')
+        self.positions.pop(emitter, None)
+
+    def _cells(self, emitter):
+        x, y = self.positions[emitter] if emitter in self.positions else (0, 0)
+        for col in range(int(x) // self.CELL, int(x + max(emitter.width, 1) - 1) // self.CELL + 1):
+            for row in range(int(y) // self.CELL, int(y + max(emitter.height, 1) - 1) // self.CELL + 1):
+                yield col, row
+
+    def _index(self, emitter):
+        if emitter in self.names:
+            for cell in self._cells(emitter):
+                self.grid.setdefault(cell, []).append(emitter)
+
+    def _unindex(self, emitter):
+        if emitter in self.names:
+            for cell in self._cells(emitter):
+                self.grid[cell].remove(emitter)
+
+    def find(self, x, y):
+        """
+        :return: the named emitter at (x, y), or None
+        """
+        for emitter in self.grid.get((x // self.CELL, y // self.CELL), ()):
+            left, top = self.positions[emitter] if emitter in self.positions else (0, 0)
+            if left <= x < left + emitter.width and top <= y < top + emitter.height:
+                return emitter
+        return None
+
+    def motion(self, event):
+        self.hovered = self.find(event.x, event.y)
+        self.show(self.describe(self.hovered, self.names[self.hovered]) if self.hovered else '')
+
+    def show(self, name):
+        if name != self.shown:
+            self.shown = name
+            self.status_text.set(name)
+
+
+class StatsProtocol(protocol.Protocol):
+    """Sends the statistics of the dashboard as JSON to a client, and disconnects."""
+
+    def connectionMade(self):
+        self.transport.write(json.dumps(self.factory.app.collect_stats(), sort_keys=True, default=str) + '\n')
+        self.transport.loseConnection()
+
+
 class TinyDashApp:
     """
     Tiny dash application class.
@@ -406,6 +2442,21 @@ class TinyDashApp:
     Reads config files, creates sensors and emitters, and triggers updates of
     emitters.
     """
+    # Milliseconds to collect emitter updates before refreshing them
+    FRAME_DELAY = 20
+    # Seconds between snapshots of the sensor values
+    SNAPSHOT_INTERVAL = 60.0
+    # Seconds to wait for more changes of the configuration files before reloading
+    RELOAD_DELAY = 0.5
+    # Seconds between checks of the configuration files where they can not be watched
+    CONFIG_POLL_INTERVAL = 2.0
+    # Changed when compile_config() produces different results, to ignore older cache files
+    CACHE_VERSION = 1
+    # Seconds before unused compiled configurations are removed from the cache
+    CACHE_MAX_AGE = 30 * 24 * 3600.0
+    # Settings which must be numbers
+    NUMERIC_SETTINGS = ('width', 'height', 'update-interval', 'min-interval', 'max-interval', 'timeout', 'radius',
+                        'thickness', 'start-angle', 'end-angle', 'max-angle', 'color-steps', 'port')
 
     def __init__(self, parent, args):
         """
@@ -422,86 +2473,49 @@ class TinyDashApp:
 
         self.args = args
 
-        # Delay thread starts until after all emitters have been created
+        if args.renderer == 'canvas':
+            self.surface = CanvasSurface(self.dash_frame, self.status_text, self.describe)
+        else:
+            self.surface = WidgetSurface(self.dash_frame, self.status_text, self.describe)
+
+        SensorBase.scheduler = SensorScheduler(args.jitter, args.max_running, args.background_interval)
+        ProcessRunner._shared = ProcessRunner(args.max_children, ProcessRunner.LAUNCHER if args.launcher else None)
+
+        # Sensors, also by identity
         self.sensors = []
+        self.shared_sensors = {}
+        # Emitters in layout order, and the model entry key of each
         self.emitters = []
+        self.entries = []
+        # Sensor, queue and sensor identity of each emitter
+        self.emitter_sensors = {}
 
-        # Default settings, also if defaults are reset
-        self.default_defaults = {'height': 40,
-                                 'width': 40,
-                                 'update-interval': 5.0, }
+        # Emitter positions, and the window size they were laid out for
+        self.positions = {}
+        self.layout_size = None
+        self.layout_timer = None
 
-        # Current default settings, which can be updated by config files
-        self.defaults = self.default_defaults
+        # Emitters of each sensor, and the emitters which can be seen
+        self.sensor_emitters = {}
+        self.visible = set()
+        self.mapped = True
 
-        for config_file in args.configfiles:
-            logging.debug('Reading configuration from %s', config_file)
-            with open(config_file) as fp:
-                config = yaml.load(fp)
-
-            logging.debug('%s', config)
-
-            for raw_item in config:
-                if self._handle_defaults(raw_item):
-                    continue
-                if self._handle_space(raw_item):
-                    continue
-
-                item = deepcopy(self.defaults)
-                item.update(raw_item)
-
-                queue = Queue.Queue()
-                thing = None
-                if item['sensor'] == 'Status':
-                    logging.debug("Found {}".format(item['sensor']))
-                    thing = StatusSensor(queue, item)
-                elif item['sensor'] == 'State':
-                    logging.debug("Found {}".format(item['sensor']))
-                    thing = StateSensor(queue, item)
-                elif item['sensor'] == 'Fraction':
-                    logging.debug("Found {}".format(item['sensor']))
-                    thing = FractionSensor(queue, item)
-                elif item['sensor'] == 'JenkinsJobState':
-                    logging.debug("Found {}".format(item['sensor']))
-                    thing = JenkinsJobStateSensor(queue, item)
-                if not thing:
-                    print "Error: {} is an unknown sensor type".format(item["sensor"])
-                    continue
-                self.sensors.append(thing)
-                if 'type' in item:
-                    try:
-                        class_ = getattr(sys.modules[__name__], item['type'])
-                        indicator = class_(self.dash_frame, queue, item)
-                        self.emitters.append(indicator)
-                        if 'name' in item:
-                            indicator.widget.bind('<Enter>',
-                                                  lambda event, name=item['name']: self.status_text.set(name))
-                            indicator.widget.bind('<Leave>', lambda event: self.status_text.set(''))
-
-                    except Exception as e:
-                        logging.error(e.message)
-                        indicator = Broken(self.dash_frame, queue, item)
-                        self.emitters.append(indicator)
-                        status_text = ''
-                        if 'name' in item:
-                            status_text = item['name'] + ': '
-                        status_text += 'Error: ' + e.message
-                        indicator.widget.bind('<Enter>',
-                                              lambda event, name=status_text: self.status_text.set(name))
-                        indicator.widget.bind('<Leave>', lambda event: self.status_text.set(''))
+        # Emitters with new data, refreshed in the next frame
+        self.dirty = set()
+        self.frame = None
 
-                else:
-                    logging.warning('Sensor %s not connected to an indicator.',
-                                    item['name'] if 'name' in item else item['sensor'])
-                    indicator = Broken(self.dash_frame, queue, item)
-                    self.emitters.append(indicator)
-                    status_text = ''
-                    if 'name' in item:
-                        status_text = item['name'] + ': '
-                    status_text += 'Error: not connected to an indicator'
-                    indicator.widget.bind('<Enter>',
-                                          lambda event, name=status_text: self.status_text.set(name))
-                    indicator.widget.bind('<Leave>', lambda event: self.status_text.set(''))
+        # Config file modification times, and pending reload
+        self.config_mtimes = {}
+        self.reload_timer = None
+
+        self.stats = DashboardStats()
+        self.stats.start()
+        self.stats_listener = None
+        if args.stats_socket:
+            self.serve_stats(args.stats_socket)
+
+        # Delay sensor starts until after all emitters have been created
+        new_sensors = self.apply_model(self.load_model())
 
         logging.debug("Laying out dashboard")
 
@@ -514,27 +2528,331 @@ class TinyDashApp:
         self.parent.update()
         self.layout()
 
+        # Show the values of the last run until the sensors have fresh ones
+        self.load_snapshot()
+
         logging.debug("Starting sensors")
 
         # Start sensors
-        for s in self.sensors:
+        for s in new_sensors:
             s.start()
 
-        # And go with updates
-        self.timer = parent.after(100, self.refresh)
+        self.snapshot_saver = task.LoopingCall(self.save_snapshot)
+        self.snapshot_saver.start(self.SNAPSHOT_INTERVAL, now=False)
+
+        self.watch_config_files()
+
+    def load_model(self):
+        """
+        Read the configuration files, see compile_config().
+
+        :return: the dashboard entries in layout order, as a list of (key, config, sensor class,
+                 indicator class) where the config is a space entry or an item with the defaults
+                 applied, and key is equal for equal entries. The indicator class is None for
+                 items without a known indicator type
+        """
+        # Default settings, also if defaults are reset
+        self.default_defaults = {'height': 40,
+                                 'width': 40,
+                                 'update-interval': 5.0, }
+
+        # Current default settings, which can be updated by config files
+        self.defaults = dict(self.default_defaults)
+
+        model = []
+        for config_file in self.args.configfiles:
+            with open(config_file) as fp:
+                content = fp.read()
+            cache_file = self.compiled_file(content)
+            compiled = self.load_compiled(cache_file)
+            if compiled is None:
+                logging.debug('Reading configuration from %s', config_file)
+                compiled = self.compile_config(content)
+                self.save_compiled(cache_file, compiled)
+            else:
+                logging.debug('Using compiled configuration of %s', config_file)
+            entries, self.defaults, errors = compiled
+            for error in errors:
+                print 'Error: {}: {}'.format(config_file, error)
+            for key, config in entries:
+                if key[0] == 'space':
+                    model.append((key, config, None, Space))
+                else:
+                    model.append((key, config, SENSORS[config['sensor']], INDICATORS.get(config.get('type'))))
+        return model
+
+    def compile_config(self, content):
+        """
+        Parse a configuration file, starting with the current defaults.
+
+        :param content: the content of the file
+        :return: (entries, defaults, errors) where entries is a list of (key, config) for the
+                 spaces and the valid items, defaults are the defaults at the end of the file,
+                 and errors are messages about invalid items
+        """
+        config = yaml.load(content)
+        logging.debug('%s', config)
+
+        entries = []
+        errors = []
+        for raw_item in config or ():
+            if not isinstance(raw_item, dict):
+                errors.append('{!r} is not a mapping'.format(raw_item))
+                continue
+            if self._handle_defaults(raw_item):
+                continue
+            if self._handle_space(raw_item, entries):
+                continue
+
+            # Items only read their configuration, so the default values can be shared
+            item = dict(self.defaults)
+            item.update(raw_item)
+
+            if 'sensor' not in item or item['sensor'] not in SENSORS:
+                errors.append('{} is an unknown sensor type'.format(item.get('sensor')))
+                continue
+            error = self._normalize(item)
+            if error:
+                errors.append(error)
+                continue
+            entries.append((('item', freeze(item)), item))
+        return entries, self.defaults, errors
+
+    def _normalize(self, item):
+        """
+        Check the types of the numeric settings of an item, and make intervals floats.
+
+        :return: an error message, or None if the item is valid
+        """
+        for key in self.NUMERIC_SETTINGS:
+            if key not in item or item[key] is None:
+                continue
+            if isinstance(item[key], bool) or not isinstance(item[key], (int, long, float)):
+                return '{} of {} is not a number: {!r}'.format(key, item.get('name', item['sensor']), item[key])
+            if key.endswith('interval') or key == 'timeout':
+                item[key] = float(item[key])
+        return None
+
+    def compiled_file(self, content):
+        """
+        :return: the cache file of a compiled configuration file, which depends on the content
+                 and the defaults at the start of the file
+        """
+        digest = hashlib.sha1(content)
+        digest.update(repr((self.CACHE_VERSION, freeze(self.defaults))))
+        return os.path.join(self.args.config_dir, 'cache', digest.hexdigest())
+
+    def load_compiled(self, cache_file):
+        """
+        :param cache_file: path returned by compiled_file()
+        :return: the compile_config() result of a configuration file from the cache, or None
+        """
+        try:
+            with open(cache_file, 'rb') as fp:
+                compiled = cPickle.load(fp)
+        except (IOError, OSError):
+            return None
+        except Exception as e:
+            logging.warning('Ignoring broken cache file %s: %s', cache_file, e)
+            return None
+        # Keep files in use from being pruned
+        os.utime(cache_file, None)
+        return compiled
+
+    def save_compiled(self, cache_file, compiled):
+        """
+        Save the compile_config() result of a configuration file, and remove results which
+        have not been used for a long time.
+
+        :param cache_file: path returned by compiled_file()
+        :param compiled: the compile_config() result
+        """
+        cache_dir = os.path.dirname(cache_file)
+        try:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            with open(cache_file + '.new', 'wb') as fp:
+                cPickle.dump(compiled, fp, cPickle.HIGHEST_PROTOCOL)
+            os.rename(cache_file + '.new', cache_file)
+            expired = time.time() - self.CACHE_MAX_AGE
+            for name in os.listdir(cache_dir):
+                path = os.path.join(cache_dir, name)
+                if os.stat(path).st_mtime < expired:
+                    os.remove(path)
+        except (IOError, OSError, cPickle.PicklingError) as e:
+            logging.warning('Failed to cache configuration in %s: %s', cache_file, e)
+
+    def apply_model(self, model):
+        """
+        Make the dashboard show a model from load_model(). Emitters of entries which are in
+        both the old and the new model are kept, the others are created or removed. Sensors
+        are shared with other emitters, also existing ones, when possible, and are stopped
+        when their last emitter is removed.
+
+        :param model: list of (key, config, sensor class, indicator class)
+        :return: the created sensors, which need to be started
+        """
+        old = {}
+        for key, emitter in self.entries:
+            old.setdefault(key, []).append(emitter)
+        known_sensors = set(self.sensors)
+
+        entries = []
+        for key, config, sensor_class, indicator_class in model:
+            if key in old and old[key]:
+                emitter = old[key].pop(0)
+            elif key[0] == 'space':
+                emitter = Space(self.surface, config)
+            else:
+                emitter = self.create_emitter(config, sensor_class, indicator_class)
+            entries.append((key, emitter))
+        self.entries = entries
+        self.emitters = [emitter for _, emitter in entries]
+
+        for emitters in old.values():
+            for emitter in emitters:
+                self.remove_emitter(emitter)
+        return [sensor for sensor in self.sensors if sensor not in known_sensors]
+
+    def create_emitter(self, item, sensor_class, indicator_class):
+        """
+        Create the sensor, or find a sensor to share, and the indicator of an item.
+
+        :param item: the item configuration dict
+        :param sensor_class: the class of the sensor
+        :param indicator_class: the class of the indicator, None if unknown
+        :return: the indicator
+        """
+        queue = ValueSlot()
+        logging.debug("Found {}".format(item['sensor']))
+        identity = sensor_class.identity(item)
+        shared = identity in self.shared_sensors
+        if shared:
+            # Same sensor as for another indicator, run it once for both
+            thing = self.shared_sensors[identity]
+            thing.subscribe(queue, item)
+        else:
+            thing = sensor_class(queue, item)
+            thing.configure(item)
+            self.shared_sensors[identity] = thing
+            self.sensors.append(thing)
+        if 'type' in item:
+            try:
+                if not indicator_class:
+                    raise ValueError('{} is an unknown indicator type'.format(item['type']))
+                indicator = indicator_class(self.surface, queue, item)
+                if 'name' in item:
+                    self.surface.set_name(indicator, item['name'])
+
+            except Exception as e:
+                logging.error(e.message)
+                indicator = Broken(self.surface, queue, item)
+                status_text = ''
+                if 'name' in item:
+                    status_text = item['name'] + ': '
+                status_text += 'Error: ' + e.message
+                self.surface.set_name(indicator, status_text)
+
+        else:
+            logging.warning('Sensor %s not connected to an indicator.',
+                            item['name'] if 'name' in item else item['sensor'])
+            indicator = Broken(self.surface, queue, item)
+            status_text = ''
+            if 'name' in item:
+                status_text = item['name'] + ': '
+            status_text += 'Error: not connected to an indicator'
+            self.surface.set_name(indicator, status_text)
+        queue.listener = lambda indicator=indicator: self.mark_dirty(indicator)
+        self.sensor_emitters.setdefault(thing, []).append(indicator)
+        self.emitter_sensors[indicator] = (thing, queue, identity)
+        if shared:
+            # Show the value of a running sensor right away
+            thing.republish()
+        return indicator
+
+    def remove_emitter(self, emitter):
+        """Remove an emitter from the dashboard, and stop its sensor unless shared."""
+        self.surface.remove(emitter)
+        self.positions.pop(emitter, None)
+        self.dirty.discard(emitter)
+        self.visible.discard(emitter)
+        if emitter not in self.emitter_sensors:
+            return
+        sensor, queue, identity = self.emitter_sensors.pop(emitter)
+        sensor.unsubscribe(queue)
+        emitters = self.sensor_emitters[sensor]
+        emitters.remove(emitter)
+        if not emitters:
+            logging.debug('Stopping sensor %s', sensor)
+            del self.sensor_emitters[sensor]
+            del self.shared_sensors[identity]
+            self.sensors.remove(sensor)
+            sensor.stop()
+
+    def watch_config_files(self):
+        """Reload the dashboard when a configuration file changes."""
+        for config_file in self.args.configfiles:
+            self.config_mtimes[config_file] = self.mtime(config_file)
+        watcher = FileWatcher.shared()
+        if watcher:
+            try:
+                for config_file in self.args.configfiles:
+                    watcher.watch(config_file, self.config_changed)
+            except (inotify.INotifyError, OSError) as e:
+                logging.warning('Can not watch %s, polling instead: %s', config_file, e)
+                watcher = None
+        if not watcher:
+            self.config_poller = task.LoopingCall(self.config_changed)
+            self.config_poller.start(self.CONFIG_POLL_INTERVAL, now=False)
+
+    @staticmethod
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def config_changed(self):
+        """
+        Reload the dashboard soon if a configuration file has been modified. Editors
+        often save files in several steps, which are waited for.
+        """
+        mtimes = dict((config_file, self.mtime(config_file)) for config_file in self.args.configfiles)
+        if mtimes == self.config_mtimes:
+            return
+        self.config_mtimes = mtimes
+        if self.reload_timer and self.reload_timer.active():
+            self.reload_timer.reset(self.RELOAD_DELAY)
+        else:
+            self.reload_timer = reactor.callLater(self.RELOAD_DELAY, self.reload)
+
+    def reload(self):
+        """Read the configuration files again, and update the dashboard to match them."""
+        self.reload_timer = None
+        logging.info('Reloading configuration')
+        try:
+            model = self.load_model()
+        except Exception as e:
+            # Keep the dashboard until the configuration is fixed
+            logging.error('Failed to reload configuration: %s', e)
+            return
+        new_sensors = self.apply_model(model)
+        self.layout()
+        for sensor in new_sensors:
+            sensor.start()
 
     def _handle_defaults(self, item):
         """Handles "defaults" type of configuration entries."""
         if 'defaults+' in item:
             if not item['defaults+']:
-                self.defaults = self.default_defaults
+                self.defaults = dict(self.default_defaults)
                 logging.debug('Defaults resetted: %s', self.defaults)
             else:
                 self.defaults.update(item['defaults+'])
                 logging.debug('Defaults updated: %s', self.defaults)
             return True
         if 'defaults' in item:
-            self.defaults = self.default_defaults
+            self.defaults = dict(self.default_defaults)
             if not item['defaults']:
                 return True
             self.defaults.update(item['defaults'])
@@ -542,16 +2860,35 @@ class TinyDashApp:
             return True
         return False
 
-    def _handle_space(self, item):
+    def _handle_space(self, item, model):
         """Handles "space" type of configuration entries."""
         if 'space' in item:
-            self.emitters.append(Space(self.dash_frame, item))
+            model.append((('space', freeze(item)), item))
             return True
         return False
 
+    def schedule_layout(self, event):
+        """
+        Lay out the dashboard in the next frame if the window size has changed. Called for
+        Configure events, which arrive in bursts during resizing and also when the window
+        is moved.
+        """
+        if event.widget is not self.parent or (event.width, event.height) == self.layout_size:
+            return
+        if not self.layout_timer:
+            self.layout_timer = self.parent.after(self.FRAME_DELAY, self.layout)
+
     def layout(self, *args):
-        logging.debug('Window width: %d', self.parent.winfo_width())
-        max_x = self.parent.winfo_width() if self.parent.winfo_width() > 1 else 600
+        start = time.time()
+        self.layout_timer = None
+        width = self.parent.winfo_width()
+        height = self.parent.winfo_height()
+        logging.debug('Window size: %dx%d', width, height)
+        self.layout_size = (width, height)
+        max_x = width if width > 1 else 600
+        # The status bar is below the dashboard
+        max_y = self.dash_frame.winfo_height() if height > 1 else None
+        visible = set()
         x = 0
         y = 0
         delta_y = 0
@@ -560,16 +2897,65 @@ class TinyDashApp:
                 y = y + delta_y
                 x = 0
                 delta_y = 0
-            emitter.widget.place(x=x, y=y)
+            if self.positions.get(emitter) != (x, y):
+                self.positions[emitter] = (x, y)
+                self.surface.place(emitter, x, y)
+            if max_y is None or y < max_y:
+                visible.add(emitter)
             x += emitter.width
             if emitter.height > delta_y:
                 delta_y = emitter.height
+        self.visible = visible
+        self.update_visibility()
+        self.stats.layouts.add(time.time() - start)
 
-    def refresh(self):
-        self.timer = self.parent.after(100, self.refresh)
+    def map_changed(self, event):
+        """Called when the window is iconified or restored."""
+        if event.widget is not self.parent:
+            return
+        self.mapped = bool(self.parent.winfo_ismapped())
+        logging.debug('Window mapped: %s', self.mapped)
+        self.update_visibility()
 
-        for emitter in self.emitters:
-            emitter.update()
+    def update_visibility(self):
+        """
+        Suspend sensors without any visible emitter, and resume the others, running them
+        right away if they were suspended. Refresh emitters which have become visible.
+        """
+        for sensor, emitters in self.sensor_emitters.items():
+            suspended = not self.mapped or not any(emitter in self.visible for emitter in emitters)
+            if suspended == sensor.suspended:
+                continue
+            logging.debug('Sensor %s suspended: %s', sensor, suspended)
+            sensor.suspended = suspended
+            if not suspended:
+                sensor.resume()
+        if self.mapped and self.dirty and not self.frame:
+            self.frame = self.parent.after(self.FRAME_DELAY, self.refresh)
+
+    def mark_dirty(self, emitter):
+        """
+        Request a refresh of an emitter which has got new data. Emitters getting data at about
+        the same time are refreshed in the same frame.
+        """
+        self.dirty.add(emitter)
+        if not self.frame and self.mapped:
+            self.frame = self.parent.after(self.FRAME_DELAY, self.refresh)
+
+    def refresh(self):
+        """Refresh the dirty emitters which can be seen. The others stay dirty."""
+        self.frame = None
+        if not self.mapped:
+            return
+        start = time.time()
+        dirty = self.dirty
+        self.dirty = set()
+        for emitter in dirty:
+            if emitter in self.visible:
+                emitter.update()
+            else:
+                self.dirty.add(emitter)
+        self.stats.refreshes.add(time.time() - start)
 
     def load_saved_geometry(self):
         geometry_file = os.path.join(self.args.config_dir, 'geometry')
@@ -589,8 +2975,122 @@ class TinyDashApp:
             with open(geometry_file, 'w') as fp:
                 fp.write(self.parent.geometry())
 
+    @staticmethod
+    def snapshot_key(identity):
+        """
+        :param identity: a sensor identity, see SensorBase.identity()
+        :return: a string identifying the sensor across runs
+        """
+        return json.dumps([identity[0].__name__] + list(identity[1:]), default=str)
+
+    def load_snapshot(self):
+        """Publish the sensor values saved by save_snapshot() in an earlier run."""
+        snapshot_file = os.path.join(self.args.config_dir, 'snapshot')
+        if not os.path.exists(snapshot_file):
+            return
+        logging.debug('Loading sensor values from %s', snapshot_file)
+        try:
+            with open(snapshot_file) as fp:
+                snapshot = json.load(fp)
+        except (IOError, ValueError) as e:
+            logging.warning('Ignoring broken snapshot %s: %s', snapshot_file, e)
+            return
+        for identity, sensor in self.shared_sensors.items():
+            key = self.snapshot_key(identity)
+            if key in snapshot:
+                try:
+                    sensor.restore(snapshot[key])
+                except (KeyError, TypeError, ValueError) as e:
+                    logging.warning('Ignoring broken snapshot of %s: %s', key, e)
+
+    def save_snapshot(self):
+        """Save the last value of each sensor, to show them on the next start."""
+        snapshot = {}
+        for identity, sensor in self.shared_sensors.items():
+            value = sensor.snapshot()
+            if value is not None:
+                snapshot[self.snapshot_key(identity)] = value
+        snapshot_file = os.path.join(self.args.config_dir, 'snapshot')
+        logging.debug('Saving %d sensor values in %s', len(snapshot), snapshot_file)
+        # Failing to save must neither stop later snapshots nor closing the window
+        try:
+            if not os.path.exists(self.args.config_dir):
+                os.makedirs(self.args.config_dir)
+            # Replace the file at once, a crash while writing must not leave half a snapshot
+            with open(snapshot_file + '.new', 'w') as fp:
+                json.dump(snapshot, fp, separators=(',', ':'), default=str)
+            os.rename(snapshot_file + '.new', snapshot_file)
+        except (IOError, OSError, TypeError, ValueError) as e:
+            logging.error('Failed to save sensor values in %s: %s', snapshot_file, e)
+
+    def describe(self, emitter, name):
+        """
+        :return: the status bar text of an emitter: its name, and the statistics of its sensor
+        """
+        if emitter not in self.emitter_sensors:
+            return name
+        sensor = self.emitter_sensors[emitter][0]
+        return '{}  [{}]'.format(name, sensor.stats.summary(sensor.update_interval, sensor.max_interval))
+
+    def collect_stats(self):
+        """
+        :return: the statistics of the dashboard and of each sensor, as a JSON serializable dict
+        """
+        sensors = []
+        for identity, sensor in self.shared_sensors.items():
+            stats = sensor.stats.as_dict()
+            stats['sensor'] = self.snapshot_key(identity)
+            stats['update-interval'] = sensor.update_interval
+            stats['max-interval'] = sensor.max_interval
+            stats['suspended'] = sensor.suspended
+            sensors.append(stats)
+        for url, server in JenkinsServer.servers.items():
+            stats = server.stats.as_dict()
+            stats['sensor'] = json.dumps(['JenkinsServer', url])
+            stats['update-interval'] = server.update_interval
+            stats['max-interval'] = None
+            stats['suspended'] = server.suspended
+            sensors.append(stats)
+        stats = self.stats.as_dict()
+        scheduler = SensorBase.scheduler
+        stats.update({'time': time.time(),
+                      'schedule-lag': scheduler.lags.as_dict(),
+                      'max-schedule-lag': scheduler.max_lag,
+                      'running-sensors': len(scheduler.running),
+                      'running-programs': len(ProcessRunner.shared().running),
+                      'waiting-programs': len(ProcessRunner.shared().waiting),
+                      'sensors': sensors})
+        return stats
+
+    def save_stats(self):
+        """Write the statistics to the --stats-file, e.g. when asked to by SIGUSR1."""
+        stats_file = self.args.stats_file
+        logging.debug('Saving statistics in %s', stats_file)
+        try:
+            with open(stats_file + '.new', 'w') as fp:
+                json.dump(self.collect_stats(), fp, indent=2, sort_keys=True, default=str)
+            os.rename(stats_file + '.new', stats_file)
+        except (IOError, OSError) as e:
+            logging.error('Failed to save statistics in %s: %s', stats_file, e)
+
+    def serve_stats(self, path):
+        """Send the statistics to each client connecting to a UNIX socket."""
+        factory = protocol.Factory()
+        factory.protocol = StatsProtocol
+        factory.app = self
+        try:
+            # Remove the socket left by an earlier run
+            if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+                os.remove(path)
+            self.stats_listener = reactor.listenUNIX(path, factory)
+        except (CannotListenError, OSError) as e:
+            logging.error('Failed to serve statistics on %s: %s', path, e)
+
     def on_closing(self, *args):
         self.save_geometry()
+        self.save_snapshot()
+        if self.stats_listener:
+            self.stats_listener.stopListening()
         self.parent.destroy()
         reactor.stop()
 
@@ -606,6 +3106,39 @@ def parse_args():
                         help='Location of tiny-dash configuration files. Default is ~/.tiny-dash')
     parser.add_argument('--geometry',
                         help='Size and position of the window')
+    parser.add_argument('--renderer',
+                        choices=['widgets', 'canvas'],
+                        default='widgets',
+                        help='Draw each indicator in a widget of its own, or all indicators on one canvas. '
+                             'The canvas is faster for large dashboards. Default is widgets')
+    parser.add_argument('--jitter',
+                        type=float,
+                        default=2.0,
+                        help='Spread the first sensor updates randomly over this many seconds. Default is 2.0')
+    parser.add_argument('--max-running',
+                        type=int,
+                        default=32,
+                        help='Max number of sensors updating at the same time, 0 for no limit. Default is 32')
+    parser.add_argument('--max-children',
+                        type=int,
+                        default=64,
+                        help='Max number of sensor programs running at the same time, 0 for no limit. '
+                             'Default is 64')
+    parser.add_argument('--launcher',
+                        action='store_true',
+                        help='Run sensor programs through a small helper process, instead of forking '
+                             'tiny-dash for each program')
+    parser.add_argument('--background-interval',
+                        type=float,
+                        default=60.0,
+                        help='Min seconds between updates of sensors whose indicators cannot be seen, because '
+                             'the window is iconified or they are scrolled out of it. Default is 60.0')
+    parser.add_argument('--stats-file',
+                        help='Write statistics of the sensors and the dashboard as JSON to this file when '
+                             'tiny-dash gets the USR1 signal')
+    parser.add_argument('--stats-socket',
+                        help='Send statistics of the sensors and the dashboard as JSON to each client '
+                             'connecting to this UNIX socket')
     parser.add_argument('--debug',
                         action='store_true',
                         help='Emit debugging information')
@@ -629,7 +3162,12 @@ if __name__ == '__main__':
         tiny.layout()
 
 
-    root.bind('<Configure>', tiny.layout)
+    root.bind('<Configure>', tiny.schedule_layout)
+    root.bind('<Map>', tiny.map_changed)
+    root.bind('<Unmap>', tiny.map_changed)
     root.bind('<Control-q>', tiny.on_closing)
+    if tiny.args.stats_file:
+        # Leave the signal handler before touching the dashboard
+        signal.signal(signal.SIGUSR1, lambda signum, frame: reactor.callFromThread(tiny.save_stats))
 
     reactor.run()
@@ -0,0 +1,55 @@
+import Queue
+import os
+import unittest
+from mock import Mock, patch
+
+import imp
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestBatchSensor(unittest.TestCase):
+    def setUp(self):
+        self.queues = {}
+        self.sensor = None
+        for key, value_type in (('up', None), ('load', None), ('state', None), ('gone', None), ('count', 'Fraction')):
+            queue = Queue.Queue()
+            config = {'program': ['batch'], 'key': key, 'value-type': value_type}
+            if self.sensor:
+                self.sensor.subscribe(queue, config)
+            else:
+                self.sensor = tiny.BatchSensor(queue, config)
+            self.queues[key] = queue
+        patcher = patch.object(tiny.SensorBase, 'scheduler', Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lines(self):
+        self.sensor.got_output('up 0\nload 0.25\n\nstate  running late \ncount 3\nother 1\n')
+        self.assertEqual({'up': 0, 'load': 0.25, 'state': 'running late', 'gone': -1, 'count': 3.0},
+                         dict((key, queue.get(0)['result']) for key, queue in self.queues.items()))
+
+    def test_json(self):
+        self.sensor.got_output('{"up": 1, "load": 0.5, "state": "ok"}')
+        items = dict((key, queue.get(0)) for key, queue in self.queues.items())
+        self.assertEqual({'value-type': tiny.SensorBase.STATUS, 'result': 1}, items['up'])
+        self.assertEqual({'value-type': tiny.SensorBase.FRACTION, 'result': 0.5}, items['load'])
+        self.assertEqual({'value-type': tiny.SensorBase.STATE, 'result': 'ok'}, items['state'])
+        self.assertEqual({'value-type': tiny.SensorBase.STATUS, 'result': -1}, items['gone'])
+        self.assertEqual({'value-type': tiny.SensorBase.FRACTION, 'result': -1}, items['count'])
+
+    def test_typed_value(self):
+        self.assertEqual((3, tiny.SensorBase.STATUS), tiny.typed_value('3'))
+        self.assertEqual((0.001, tiny.SensorBase.FRACTION), tiny.typed_value('1e-3'))
+        self.assertEqual((0.00005, tiny.SensorBase.FRACTION), tiny.typed_value('5E-05'))
+        self.assertEqual((0.5, tiny.SensorBase.FRACTION), tiny.typed_value(0.5))
+        self.assertEqual((1, tiny.SensorBase.STATUS), tiny.typed_value('1e0', tiny.SensorBase.STATUS))
+        self.assertEqual(('1e-3', tiny.SensorBase.STATE), tiny.typed_value('1e-3', tiny.SensorBase.STATE))
+
+    def test_broken(self):
+        self.sensor.got_output('garbage')
+        self.assertEqual([-1] * 5, [queue.get(0)['result'] for queue in self.queues.values()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import unittest
+from mock import patch, Mock
+
+import imp
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class Emitter(object):
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.widget = None
+
+
+class TestCanvasSurface(unittest.TestCase):
+    @patch('tinydash.Canvas')
+    def test_find(self, Canvas):
+        surface = tiny.CanvasSurface(Mock(), Mock())
+        small = Emitter(20, 20)
+        large = Emitter(100, 150)
+        anonymous = Emitter(40, 40)
+        surface.set_name(small, 'small')
+        surface.set_name(large, 'large')
+        surface.place(small, 60, 60)
+        surface.place(large, 80, 0)
+        surface.place(anonymous, 0, 0)
+        self.assertIsNone(surface.find(10, 10))
+        self.assertIs(small, surface.find(60, 60))
+        self.assertIs(small, surface.find(79, 79))
+        self.assertIs(large, surface.find(80, 79))
+        self.assertIs(large, surface.find(179, 149))
+        self.assertIsNone(surface.find(180, 149))
+        surface.place(small, 200, 200)
+        self.assertIsNone(surface.find(60, 60))
+        self.assertIs(small, surface.find(210, 210))
+
+    @patch('tinydash.Canvas')
+    def test_place(self, Canvas):
+        surface = tiny.CanvasSurface(Mock(), Mock())
+        canvas, tag = surface.new_canvas(40, 40)
+        emitter = Emitter(40, 40)
+        emitter.widget = canvas
+        emitter.tag = tag
+        surface.place(emitter, 40, 0)
+        surface.place(emitter, 0, 40)
+        canvas.move.assert_called_with(tag, -40, 40)
+
+    @patch('tinydash.Canvas')
+    def test_remove(self, Canvas):
+        surface = tiny.CanvasSurface(Mock(), Mock())
+        canvas, tag = surface.new_canvas(40, 40)
+        emitter = Emitter(40, 40)
+        emitter.widget = canvas
+        emitter.tag = tag
+        surface.set_name(emitter, 'gone')
+        surface.place(emitter, 40, 0)
+        surface.remove(emitter)
+        canvas.delete.assert_called_once_with(tag)
+        self.assertIsNone(surface.find(50, 10))
+        self.assertEqual({}, surface.positions)
+
+
+if __name__ == '__main__':
+    unittest.main()
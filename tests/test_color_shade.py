@@ -0,0 +1,26 @@
+import os
+import unittest
+
+import imp
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestColorShade(unittest.TestCase):
+    def test_shade(self):
+        shade = tiny.ColorShade((0, 65535, 0), (65535, 0, 0), 5)
+        self.assertEqual('#0000ffff0000', shade.shade(0.0))
+        self.assertEqual('#0000ffff0000', shade.shade(0.1))
+        self.assertEqual('#3fffbfff0000', shade.shade(0.2))
+        self.assertEqual(shade.compute(0.5), shade.shade(0.5))
+        self.assertEqual('#ffff00000000', shade.shade(1.0))
+
+    def test_shared(self):
+        shade = tiny.ColorShade.get((1, 2, 3), (4, 5, 6), 16)
+        self.assertIs(shade, tiny.ColorShade.get([1, 2, 3], [4, 5, 6], 16))
+        self.assertIsNot(shade, tiny.ColorShade.get((1, 2, 3), (4, 5, 6), 1024))
+        self.assertEqual(1024, len(tiny.ColorShade.get((1, 2, 3), (4, 5, 6), 1024).table))
+
+
+if __name__ == '__main__':
+    unittest.main()
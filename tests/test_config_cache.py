@@ -0,0 +1,84 @@
+import argparse
+import new
+import os
+import shutil
+import tempfile
+import unittest
+from mock import patch
+
+import imp
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+CONFIG = """
+- defaults:
+    type: Lamp
+    sensor: Status
+    update-interval: 2
+- program: ['foo']
+- space: 20x20
+- defaults+:
+    shape: square
+- program: ['bar']
+  type: Foo
+- program: ['bad']
+  width: wide
+- sensor: NoSuchSensor
+"""
+
+MORE = """
+- program: ['zoq']
+- defaults:
+- sensor: State
+"""
+
+
+class TestConfigCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        files = []
+        for name, content in (('a.config', CONFIG), ('b.config', MORE)):
+            files.append(os.path.join(self.dir, name))
+            with open(files[-1], 'w') as fp:
+                fp.write(content)
+        self.app = new.instance(tiny.TinyDashApp)
+        self.app.args = argparse.Namespace(configfiles=files, config_dir=os.path.join(self.dir, 'config'))
+
+    def check(self, model):
+        self.assertEqual(['item', 'space', 'item', 'item', 'item'], [key[0] for key, _, _, _ in model])
+        _, foo, sensor_class, indicator_class = model[0]
+        self.assertEqual({'type': 'Lamp', 'sensor': 'Status', 'update-interval': 2.0, 'program': ['foo'],
+                          'width': 40, 'height': 40}, foo)
+        self.assertIsInstance(foo['update-interval'], float)
+        self.assertIs(tiny.StatusSensor, sensor_class)
+        self.assertIs(tiny.Lamp, indicator_class)
+        self.assertIs(tiny.Space, model[1][3])
+        self.assertEqual(('Foo', 'square', None), (model[2][1]['type'], model[2][1]['shape'], model[2][3]))
+        self.assertEqual(['zoq'], model[3][1]['program'])
+        self.assertEqual('square', model[3][1]['shape'])
+        # Defaults are reset to the built-in defaults
+        self.assertEqual({'sensor': 'State', 'width': 40, 'height': 40, 'update-interval': 5.0}, model[4][1])
+
+    def test_cache(self):
+        model = self.app.load_model()
+        self.check(model)
+        self.assertEqual(2, len(os.listdir(os.path.join(self.dir, 'config', 'cache'))))
+        with patch.object(tiny.TinyDashApp, 'compile_config', side_effect=AssertionError('not cached')):
+            cached = self.app.load_model()
+        self.check(cached)
+        self.assertEqual([key for key, _, _, _ in model], [key for key, _, _, _ in cached])
+
+    def test_changed(self):
+        self.app.load_model()
+        with open(self.app.args.configfiles[0], 'a') as fp:
+            fp.write("- program: ['new']\n")
+        model = self.app.load_model()
+        # The defaults at the end of the first file are the same, so the second file is still cached
+        self.assertEqual(3, len(os.listdir(os.path.join(self.dir, 'config', 'cache'))))
+        self.assertEqual(['new'], model[3][1]['program'])
+        self.assertEqual(['zoq'], model[4][1]['program'])
+
+
+if __name__ == '__main__':
+    unittest.main()
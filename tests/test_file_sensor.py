@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+
+import imp
+from mock import Mock
+from twisted.internet import defer, reactor, task
+from twisted.trial import unittest
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestFileSensor(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'flag')
+        self.watcher = tiny.FileWatcher() if tiny.inotify else None
+        self.patch(tiny.FileWatcher, '_shared', self.watcher)
+        if self.watcher:
+            self.addCleanup(self.watcher.notifier.loseConnection)
+
+    def write(self, content):
+        with open(self.path, 'w') as fp:
+            fp.write(content)
+
+    def read(self, value_type):
+        return tiny.FileSensor(tiny.ValueSlot(), {'path': self.path, 'value-type': value_type}).read()
+
+    def test_read(self):
+        self.assertEqual([1, -1, -1], [self.read(value_type) for value_type in ('Status', 'State', 'Fraction')])
+        self.write('running\nsince yesterday\n')
+        self.assertEqual([0, 'running', -1], [self.read(value_type) for value_type in ('Status', 'State', 'Fraction')])
+        self.write('0.75\n')
+        self.assertEqual(0.75, self.read('Fraction'))
+        self.assertEqual(-1, self.read('Foo'))
+
+    @defer.inlineCallbacks
+    def test_watch(self):
+        if not self.watcher:
+            raise unittest.SkipTest('No inotify')
+        slot = tiny.ValueSlot()
+        sensor = tiny.FileSensor(slot, {'path': self.path})
+        scheduler = Mock()
+        self.patch(tiny.SensorBase, 'scheduler', scheduler)
+        sensor.start()
+        self.assertFalse(scheduler.start.called)
+        self.assertEqual(1, slot.get()['result'])
+        self.write('')
+        yield task.deferLater(reactor, 0.1, lambda: None)
+        self.assertEqual(0, slot.get()['result'])
+        self.write('again')
+        yield task.deferLater(reactor, 0.1, lambda: None)
+        self.assertTrue(slot.empty())
+        os.remove(self.path)
+        yield task.deferLater(reactor, 0.1, lambda: None)
+        self.assertEqual(1, slot.get()['result'])
+        sensor.stop()
+        self.assertEqual({}, self.watcher.directories)
+        self.write('')
+        yield task.deferLater(reactor, 0.1, lambda: None)
+        self.assertTrue(slot.empty())
+
+    def test_poll(self):
+        sensor = tiny.FileSensor(tiny.ValueSlot(), {'path': os.path.join(self.dir, 'missing', 'flag')})
+        scheduler = Mock()
+        self.patch(tiny.SensorBase, 'scheduler', scheduler)
+        sensor.start()
+        scheduler.start.assert_called_once_with(sensor)
@@ -0,0 +1,112 @@
+import Queue
+import json
+import os
+
+import imp
+from twisted.internet import defer, reactor, task
+from twisted.trial import unittest
+from twisted.web import resource, server
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class LastBuild(resource.Resource):
+    isLeaf = True
+
+    def __init__(self, data):
+        resource.Resource.__init__(self)
+        self.data = data
+
+    def render_GET(self, request):
+        if self.data is None:
+            # Never answer
+            return server.NOT_DONE_YET
+        return json.dumps(self.data)
+
+
+class Jobs(resource.Resource):
+    isLeaf = True
+
+    def __init__(self):
+        resource.Resource.__init__(self)
+        self.requests = []
+
+    def render_GET(self, request):
+        self.requests.append(request.args)
+        return json.dumps({'jobs': [{'name': 'ok', 'lastBuild': {'building': False, 'result': 'SUCCESS'}},
+                                    {'name': 'a job', 'lastBuild': {'building': True, 'result': None}},
+                                    {'name': 'never built', 'lastBuild': None},
+                                    {'name': 'folder'}]})
+
+
+class TestJenkinsJobStateSensor(unittest.TestCase):
+    def setUp(self):
+        root = resource.Resource()
+        self.jobs = Jobs()
+        root.putChild('api', self.jobs)
+        for name, data in (('ok', {'building': False, 'result': 'SUCCESS'}),
+                           ('building', {'building': True, 'result': None}),
+                           ('hung', None)):
+            job = resource.Resource()
+            job.putChild('lastBuild', LastBuild(data))
+            root.putChild(name, job)
+        self.site = server.Site(root)
+        self.port = reactor.listenTCP(0, self.site, interface='127.0.0.1')
+        self.client = tiny.HttpClient()
+        self.patch(tiny.HttpClient, '_shared', self.client)
+        self.servers = {}
+        self.patch(tiny.JenkinsServer, 'servers', self.servers)
+        self.scheduler = tiny.SensorScheduler()
+        self.patch(tiny.SensorBase, 'scheduler', self.scheduler)
+
+    @defer.inlineCallbacks
+    def tearDown(self):
+        if self.scheduler.timer and self.scheduler.timer.active():
+            self.scheduler.timer.cancel()
+        # Let the last connection go back to the pool before closing the pool
+        yield task.deferLater(reactor, 0, lambda: None)
+        yield self.client.pool.closeCachedConnections()
+        yield self.port.stopListening()
+        yield task.deferLater(reactor, 0.05, lambda: None)
+
+    def sensor(self, queue, path, timeout=5.0):
+        sensor = tiny.JenkinsJobStateSensor(queue, {'url': 'http://127.0.0.1:{}/{}'.format(self.port.getHost().port,
+                                                                                           path),
+                                                    'timeout': timeout})
+        return sensor
+
+    def poll(self, job, timeout=5.0):
+        queue = Queue.Queue()
+        sensor = self.sensor(queue, job, timeout)
+        d = defer.Deferred()
+        self.patch(tiny.JenkinsJobStateSensor, 'update',
+                   lambda sensor, result: (sensor.publish(result), d.callback(queue.get(0)['result'])))
+        sensor.run()
+        return d
+
+    @defer.inlineCallbacks
+    def test_states(self):
+        self.assertEqual('SUCCESS', (yield self.poll('ok')))
+        self.assertEqual('BUILDING', (yield self.poll('building')))
+        self.assertEqual(-1, (yield self.poll('nosuchjob')))
+
+    @defer.inlineCallbacks
+    def test_timeout(self):
+        self.assertEqual(-1, (yield self.poll('hung', timeout=0.2)))
+
+    @defer.inlineCallbacks
+    def test_server(self):
+        queue = Queue.Queue()
+        for job in ('ok', 'a%20job', 'never%20built', 'folder', 'missing/'):
+            self.sensor(queue, 'job/' + job).start()
+        self.assertEqual(1, len(self.servers))
+        jenkins = self.servers.values()[0]
+        d = defer.Deferred()
+        jenkins.update = lambda states: d.callback(states)
+        yield task.deferLater(reactor, 0, lambda: None)
+        states = yield d
+        self.assertEqual({'ok': 'SUCCESS', 'a job': 'BUILDING'}, states)
+        self.assertEqual([{'tree': ['jobs[name,lastBuild[building,result]]']}], self.jobs.requests)
+        tiny.JenkinsServer.update(jenkins, states)
+        results = [queue.get(0)['result'] for _ in range(5)]
+        self.assertEqual(sorted(['SUCCESS', 'BUILDING', -1, -1, -1]), sorted(results))
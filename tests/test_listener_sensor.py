@@ -0,0 +1,60 @@
+import os
+import shutil
+import socket
+import tempfile
+import time
+
+import imp
+from twisted.internet import defer, reactor, task
+from twisted.trial import unittest
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestListenerSensor(unittest.TestCase):
+    def setUp(self):
+        self.queues = dict((key, tiny.ValueSlot()) for key in ('jobs', 'load', 'state'))
+        self.sensor = None
+        for key, queue in self.queues.items():
+            if self.sensor:
+                self.sensor.subscribe(queue, {'key': key})
+            else:
+                self.sensor = tiny.ListenerSensor(queue, {'key': key, 'port': 0})
+
+    def results(self):
+        return dict((key, queue.get(0)['result']) for key, queue in self.queues.items() if not queue.empty())
+
+    def test_datagrams(self):
+        proto = tiny.ListenerProtocol(self.sensor)
+        proto.datagramReceived('jobs:3|c\nload:0.5|g\nbad line\nother:1|g')
+        self.assertEqual({'jobs': 3, 'load': 0.5}, self.results())
+        for i in range(1000):
+            proto.datagramReceived('jobs:{}|g'.format(i))
+        proto.datagramReceived('state:running|s')
+        self.assertEqual({'jobs': 999, 'state': 'running'}, self.results())
+
+    def test_many_keys(self):
+        queues = [tiny.ValueSlot() for _ in range(5000)]
+        for i, queue in enumerate(queues):
+            self.sensor.subscribe(queue, {'key': 'key{}'.format(i)})
+        proto = tiny.ListenerProtocol(self.sensor)
+        start = time.time()
+        for i in range(5000):
+            proto.datagramReceived('key{}:{}|g'.format(i, i))
+        # Each datagram only visits the subscribers of its keys
+        self.assertLess(time.time() - start, 2.0)
+        self.assertEqual(range(5000), [queue.get(0)['result'] for queue in queues])
+        self.assertEqual({}, self.results())
+
+    @defer.inlineCallbacks
+    def test_socket(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.sensor.socket = os.path.join(directory, 'socket')
+        self.sensor.start()
+        self.addCleanup(self.sensor.listener.stopListening)
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        client.sendto('load:0.25|g', self.sensor.socket)
+        client.close()
+        yield task.deferLater(reactor, 0.05, lambda: None)
+        self.assertEqual({'load': 0.25}, self.results())
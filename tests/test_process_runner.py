@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import time
+
+import imp
+from twisted.internet import defer, reactor, task
+from twisted.trial import unittest
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestProcessRunner(unittest.TestCase):
+    @defer.inlineCallbacks
+    def test_value(self):
+        runner = tiny.ProcessRunner()
+        self.assertEqual(3, (yield runner.get_value(['sh', '-c', 'exit 3'])))
+        self.assertEqual(-1, (yield runner.get_value(['sh', '-c', 'kill -9 $$'])))
+        self.assertEqual('foo\n', (yield runner.get_output(['echo', 'foo'])))
+        yield self.assertFailure(runner.get_output(['sh', '-c', 'echo foo >&2']), IOError)
+
+    @defer.inlineCallbacks
+    def test_timeout(self):
+        runner = tiny.ProcessRunner()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        marker = os.path.join(directory, 'marker')
+        start = time.time()
+        # The child of the shell must be killed too, or it would create the marker
+        d = runner.get_value(['sh', '-c', 'sleep 1 && touch {}; sleep 10'.format(marker)], 0.2)
+        yield self.assertFailure(d, tiny.ProcessTimeout)
+        self.assertTrue(time.time() - start < 1.0)
+        while runner.running:
+            yield task.deferLater(reactor, 0.05, lambda: None)
+        yield task.deferLater(reactor, 1.0, lambda: None)
+        self.assertFalse(os.path.exists(marker))
+
+    @defer.inlineCallbacks
+    def test_max_children(self):
+        runner = tiny.ProcessRunner(max_children=1)
+        first = runner.get_output(['sh', '-c', 'sleep 0.2; echo first'])
+        second = runner.get_output(['echo', 'second'])
+        self.assertEqual(1, len(runner.running))
+        self.assertEqual(1, len(runner.waiting))
+        self.assertEqual(['first\n', 'second\n'], (yield defer.gatherResults([first, second])))
+        self.assertEqual(0, len(runner.running))
+
+    @defer.inlineCallbacks
+    def test_launcher(self):
+        runner = tiny.ProcessRunner(max_children=2, launcher=tiny.ProcessRunner.LAUNCHER)
+        self.assertTrue(runner.launcher)
+        self.assertEqual(3, (yield runner.get_value(['sh', '-c', 'exit 3'])))
+        self.assertEqual('\xff\n', (yield runner.get_output(['printf', '\\377\\n'])))
+        yield self.assertFailure(runner.get_output(['sh', '-c', 'echo foo >&2']), IOError)
+        yield self.assertFailure(runner.get_value(['sleep', '10'], 0.2), tiny.ProcessTimeout)
+        # A background child keeping the output open is killed too
+        start = time.time()
+        yield self.assertFailure(runner.get_value(['sh', '-c', 'sleep 6 & exit 0'], 0.2), tiny.ProcessTimeout)
+        self.assertTrue(time.time() - start < 1.0)
+        results = yield defer.gatherResults([runner.get_value(['true']) for _ in range(5)])
+        self.assertEqual([0] * 5, results)
+        self.assertEqual(0, len(runner.running))
+        # Programs are run directly when the launcher has died
+        runner.launcher.transport.closeStdin()
+        while runner.launcher:
+            yield task.deferLater(reactor, 0.05, lambda: None)
+        self.assertEqual(0, (yield runner.get_value(['true'])))
@@ -1,10 +1,13 @@
 import Queue
+import argparse
+import json
+import new
 import os
+import shutil
+import tempfile
 import unittest
-from mock import patch
+from mock import Mock, patch
 import imp
-from twisted.internet import reactor
-import sys
 
 tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
 
@@ -14,29 +17,149 @@ class EchoSensor(tiny.SensorBase):
         self.update('foo')
 
 
-nof_calls = 0
-
-
-def callLater(a, b):
-    global nof_calls
-    nof_calls += 1
-    return 'obj'
-
-
 class TestSensorBase(unittest.TestCase):
-    @patch('tinydash.reactor.callLater', callLater)
     def test_sensor(self, ):
         queue = Queue.Queue()
         sensor = EchoSensor(queue, 0.1)
+        sensor.scheduler = Mock()
         sensor.start()
-        self.assertEqual(1, nof_calls)
+        sensor.scheduler.start.assert_called_once_with(sensor)
         sensor.timeout_triggered()
         try:
             item = queue.get(True, 5)
         except Queue.Empty:
             self.fail('Queue not populated')
         self.assertEqual(item['result'], 'foo', 'Get value')
-        self.assertEqual(2, nof_calls)
+        sensor.scheduler.finished.assert_called_once_with(sensor)
+        sensor.scheduler.schedule.assert_called_once_with(sensor, 0.1)
+
+    def test_adaptive(self):
+        sensor = EchoSensor(Queue.Queue(), 5.0)
+        sensor.configure({'update-interval': 5.0, 'min-interval': 1.0, 'max-interval': 4.0})
+        intervals = [sensor.next_interval(result) for result in (0, 0, 0, 0, 0, 0, 1, 1, -1, -1, -1, 'x', 'x')]
+        self.assertEqual([1.0, 1.5, 2.25, 3.375, 4.0, 4.0, 1.0, 1.5, 1.0, 1.0, 1.0, 1.0, 1.5], intervals)
+        sensor = EchoSensor(Queue.Queue(), 5.0)
+        sensor.configure({'update-interval': 5.0})
+        self.assertEqual([5.0, 5.0], [sensor.next_interval(0) for _ in range(2)])
+
+    def test_shared(self):
+        config = {'update-interval': 2.0, 'program': ['foo', 'bar'], 'name': 'Foo', 'type': 'Lamp'}
+        same = {'update-interval': 2.0, 'program': ('foo', 'bar'), 'name': 'Other', 'type': 'Meter'}
+        self.assertEqual(tiny.StatusSensor.identity(config), tiny.StatusSensor.identity(same))
+        self.assertNotEqual(tiny.StatusSensor.identity(config), tiny.StateSensor.identity(config))
+        self.assertNotEqual(tiny.StatusSensor.identity(config),
+                            tiny.StatusSensor.identity(dict(config, program=['foo'])))
+        self.assertNotEqual(tiny.StatusSensor.identity(config),
+                            tiny.StatusSensor.identity(dict(config, stream='lines')))
+        queues = [Queue.Queue(), Queue.Queue()]
+        sensor = tiny.StatusSensor(queues[0], config)
+        sensor.subscribe(queues[1], same)
+        sensor.publish(0)
+        self.assertEqual([0, 0], [queue.get(0)['result'] for queue in queues])
+
+    def test_snapshot(self):
+        sensor = EchoSensor(Queue.Queue(), 10.0)
+        self.assertIsNone(sensor.snapshot())
+        sensor.value_type = tiny.SensorBase.STATE
+        sensor.publish('foo')
+        snapshot = json.loads(json.dumps(sensor.snapshot()))
+        queue = Queue.Queue()
+        restored = EchoSensor(queue, 10.0)
+        restored.restore(dict(snapshot, time=snapshot['time'] - 4.0))
+        self.assertEqual({'value-type': tiny.SensorBase.STATE, 'result': 'foo', 'stale': True}, queue.get(0))
+        # A new subscriber sees the restored value as stale too
+        restored.republish()
+        self.assertEqual({'value-type': tiny.SensorBase.STATE, 'result': 'foo', 'stale': True}, queue.get(0))
+        with patch.object(EchoSensor, 'scheduler') as scheduler:
+            restored.start()
+        age = scheduler.start.call_args[0][1]
+        self.assertTrue(4.0 <= age < 5.0)
+        restored.publish('bar', tiny.SensorBase.STATE)
+        queue.get(0)
+        restored.republish()
+        self.assertEqual({'value-type': tiny.SensorBase.STATE, 'result': 'bar'}, queue.get(0))
+
+    def test_snapshot_bytes(self):
+        # Program output in any encoding survives JSON
+        for value in ('caf\xc3\xa9', 'caf\xe9'):
+            sensor = EchoSensor(Queue.Queue(), 10.0)
+            sensor.value_type = tiny.SensorBase.STATE
+            sensor.publish(value)
+            snapshot = json.loads(json.dumps(sensor.snapshot()))
+            queue = Queue.Queue()
+            EchoSensor(queue, 10.0).restore(snapshot)
+            item = queue.get(0)
+            self.assertEqual({'value-type': tiny.SensorBase.STATE, 'result': value, 'stale': True}, item)
+            self.assertIs(str, type(item['result']))
+        sensor = tiny.ListenerSensor(Queue.Queue(), {'key': 'st\xe4te'})
+        sensor.publish({'st\xe4te': 'caf\xe9'})
+        queue = Queue.Queue()
+        tiny.ListenerSensor(queue, {'key': 'st\xe4te'}).restore(json.loads(json.dumps(sensor.snapshot())))
+        self.assertEqual('caf\xe9', queue.get(0)['result'])
+
+    def test_snapshot_errors(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        app = new.instance(tiny.TinyDashApp)
+        sensor = tiny.StateSensor(Queue.Queue(), {'program': ['state']})
+        app.shared_sensors = {tiny.StateSensor.identity({'program': ['state']}): sensor}
+        with open(os.path.join(directory, 'snapshot'), 'w') as fp:
+            json.dump({app.snapshot_key(app.shared_sensors.keys()[0]): {'result': 'ok'}}, fp)
+        app.args = argparse.Namespace(config_dir=directory)
+        app.load_snapshot()
+        self.assertIsNone(sensor.last_value)
+        sensor.publish('ok')
+        # The config dir can not be created
+        app.args = argparse.Namespace(config_dir=os.path.join(directory, 'snapshot', 'dir'))
+        app.save_snapshot()
+
+    def test_keyed_snapshot(self):
+        sensor = tiny.ListenerSensor(Queue.Queue(), {'key': 'a'})
+        sensor.publish({'a': 1})
+        sensor.publish({'b': 2.5})
+        self.assertEqual([['a', 1], ['b', 2.5]], sorted(sensor.snapshot()['result']))
+        # Keys which are not strings survive JSON, keys without indicators are dropped
+        sensor = tiny.CpuSensor(Queue.Queue(), {})
+        sensor.publish({None: 0.5, 0: 0.25, 1: 0.75})
+        snapshot = json.loads(json.dumps(sensor.snapshot()))
+        queues = [Queue.Queue(), Queue.Queue()]
+        restored = tiny.CpuSensor(queues[0], {})
+        restored.subscribe(queues[1], {'cpu': 0})
+        restored.restore(snapshot)
+        self.assertEqual([0.5, 0.25], [queue.get(0)['result'] for queue in queues])
+        self.assertEqual({None: 0.5, 0: 0.25}, restored.last_value[0])
+        # Only the keys without fresh values are republished as stale
+        restored.publish({0: 0.5})
+        queues[1].get(0)
+        restored.republish()
+        self.assertEqual({'value-type': tiny.SensorBase.FRACTION, 'result': 0.5, 'stale': True}, queues[0].get(0))
+        self.assertEqual({'value-type': tiny.SensorBase.FRACTION, 'result': 0.5}, queues[1].get(0))
+
+    @patch.object(EchoSensor, 'scheduler')
+    def test_stop(self, scheduler):
+        queues = [Queue.Queue(), Queue.Queue()]
+        sensor = EchoSensor(queues[0], 1.0)
+        sensor.subscribe(queues[1], {})
+        sensor.unsubscribe(queues[0])
+        sensor.run()
+        self.assertTrue(queues[0].empty())
+        self.assertEqual('foo', queues[1].get(0)['result'])
+        sensor.stop()
+        scheduler.cancel.assert_called_once_with(sensor)
+        scheduler.schedule.reset_mock()
+        sensor.run()
+        self.assertFalse(scheduler.schedule.called)
+
+    def test_keyed_unsubscribe(self):
+        queues = [Queue.Queue(), Queue.Queue()]
+        sensor = tiny.ListenerSensor(queues[0], {'key': 'a'})
+        sensor.subscribe(queues[1], {'key': 'a'})
+        sensor.unsubscribe(queues[0])
+        sensor.publish({'a': 1})
+        self.assertTrue(queues[0].empty())
+        self.assertEqual(1, queues[1].get(0)['result'])
+        sensor.unsubscribe(queues[1])
+        self.assertEqual({}, sensor.subscribers)
 
 
 if __name__ == '__main__':
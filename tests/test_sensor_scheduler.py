@@ -0,0 +1,132 @@
+import os
+import unittest
+from mock import patch, Mock
+
+import imp
+from twisted.internet import task
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class Sensor(object):
+    def __init__(self, scheduler, update_interval, done=True):
+        self.scheduler = scheduler
+        self.update_interval = update_interval
+        self.done = done
+        self.suspended = False
+        self.runs = []
+        self.stats = tiny.SensorStats()
+
+    def timeout_triggered(self):
+        self.runs.append(tiny.reactor.seconds())
+        if self.done:
+            self.finish()
+
+    def finish(self):
+        self.scheduler.finished(self)
+        self.scheduler.schedule(self, self.update_interval)
+
+
+class TestSensorScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = task.Clock()
+        patcher = patch('tinydash.reactor', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_schedule(self):
+        scheduler = tiny.SensorScheduler()
+        fast = Sensor(scheduler, 1.0)
+        slow = Sensor(scheduler, 3.0)
+        scheduler.start(fast)
+        scheduler.start(slow)
+        self.clock.pump([0] + [0.5] * 14)
+        self.assertEqual([0, 1, 2, 3, 4, 5, 6, 7], fast.runs)
+        self.assertEqual([0, 3, 6], slow.runs)
+        self.assertEqual(1, len(self.clock.getDelayedCalls()))
+
+    def test_jitter(self):
+        scheduler = tiny.SensorScheduler(jitter=4.0)
+        sensors = [Sensor(scheduler, 10.0) for _ in range(50)]
+        for sensor in sensors:
+            scheduler.start(sensor)
+        self.clock.pump([0.1] * 40)
+        starts = [sensor.runs[0] for sensor in sensors]
+        self.assertTrue(0.0 <= min(starts) < 1.5)
+        self.assertTrue(2.5 < max(starts) <= 4.01)
+
+    def test_age(self):
+        scheduler = tiny.SensorScheduler(jitter=1.0)
+        fresh = Sensor(scheduler, 10.0)
+        stale = Sensor(scheduler, 10.0)
+        missing = Sensor(scheduler, 10.0)
+        scheduler.start(fresh, 2.0)
+        scheduler.start(stale, 30.0)
+        scheduler.start(missing)
+        self.clock.pump([0.5] * 20)
+        self.assertTrue(0.0 <= stale.runs[0] <= 1.0)
+        self.assertTrue(0.0 <= missing.runs[0] <= 1.0)
+        self.assertEqual([8.0], fresh.runs)
+
+    def test_cancel(self):
+        scheduler = tiny.SensorScheduler(max_running=1)
+        sensors = [Sensor(scheduler, 1.0, done=False) for _ in range(3)]
+        for sensor in sensors:
+            scheduler.start(sensor)
+        self.clock.advance(0)
+        scheduler.cancel(sensors[1])
+        scheduler.cancel(sensors[2])
+        scheduler.start(sensors[2])
+        sensors[0].finish()
+        self.clock.pump([0, 1.0])
+        sensors[2].finish()
+        self.assertEqual([[0, 1], [], [0]], [sensor.runs for sensor in sensors])
+
+    def test_max_running(self):
+        scheduler = tiny.SensorScheduler(max_running=2)
+        sensors = [Sensor(scheduler, 5.0, done=False) for _ in range(3)]
+        for sensor in sensors:
+            scheduler.start(sensor)
+        self.clock.advance(0)
+        self.assertEqual([[0], [0], []], [sensor.runs for sensor in sensors])
+        self.clock.advance(2.0)
+        sensors[1].finish()
+        self.assertEqual([0, 0, 2], [sensor.runs[0] for sensor in sensors])
+        self.assertEqual(2.0, scheduler.lag)
+        self.assertEqual(2.0, scheduler.max_lag)
+        self.clock.advance(0.5)
+        sensors[0].finish()
+        self.assertEqual([1, 1, 0], [sensor.stats.durations.count for sensor in sensors])
+        self.assertEqual(2.5, sensors[0].stats.durations.max)
+        self.assertEqual(2.0, sensors[1].stats.durations.max)
+
+    def test_suspended(self):
+        scheduler = tiny.SensorScheduler(background_interval=10.0)
+        sensor = Sensor(scheduler, 1.0)
+        scheduler.start(sensor)
+        self.clock.pump([0, 1.0])
+        sensor.suspended = True
+        self.clock.pump([1.0] * 12)
+        # Run in the background, background_interval after the last run
+        self.assertEqual([0, 1, 11], sensor.runs)
+        sensor.suspended = False
+        scheduler.run_now(sensor)
+        self.clock.pump([0, 1.0])
+        self.assertEqual([0, 1, 11, 13, 14], sensor.runs)
+        self.assertEqual(1, len(self.clock.getDelayedCalls()))
+
+    def test_raising(self):
+        scheduler = tiny.SensorScheduler(max_running=1)
+        healthy = Sensor(scheduler, 1.0)
+        broken = Sensor(scheduler, 2.0)
+        broken.timeout_triggered = Mock(side_effect=TypeError('broken'))
+        scheduler.start(broken)
+        scheduler.start(healthy)
+        self.clock.pump([0] + [0.5] * 10)
+        self.assertEqual([0, 1, 2, 3, 4, 5], healthy.runs)
+        self.assertEqual(3, broken.timeout_triggered.call_count)
+        self.assertEqual({}, scheduler.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
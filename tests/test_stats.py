@@ -0,0 +1,74 @@
+import Queue
+import os
+import unittest
+from mock import Mock, patch
+
+import imp
+from twisted.internet import task
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestStats(unittest.TestCase):
+    def test_histogram(self):
+        histogram = tiny.Histogram()
+        self.assertEqual({'count': 0, 'mean': 0.0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0, 'max': 0.0},
+                         histogram.as_dict())
+        for value in [0.0005] * 50 + [0.003] * 40 + [0.1] * 9 + [1000.0]:
+            histogram.add(value)
+        self.assertEqual(100, histogram.count)
+        self.assertEqual(0.001, histogram.percentile(0.5))
+        self.assertEqual(0.004, histogram.percentile(0.9))
+        self.assertEqual(0.128, histogram.percentile(0.99))
+        self.assertEqual(1000.0, histogram.percentile(1.0))
+        self.assertEqual(1000.0, histogram.max)
+
+    @patch('tinydash.time')
+    def test_sensor_stats(self, time):
+        time.time.side_effect = [10.0, 10.0, 12.0, 12.0, 13.0, 15.0, 15.0, 16.0]
+        sensor = tiny.SensorBase(Queue.Queue(), 2.0)
+        sensor.publish(0)
+        sensor.publish(-1)
+        sensor.republish()
+        sensor.publish(1)
+        sensor.restore({'result': 0, 'value-type': None, 'time': 1.0})
+        self.assertEqual(3, sensor.stats.results)
+        self.assertEqual(1, sensor.stats.failures)
+        self.assertEqual(2, sensor.stats.intervals.count)
+        self.assertEqual(2.5, sensor.stats.intervals.mean())
+        self.assertEqual('3 results, 1 failed, every 2.5 s (configured 2.0 s)', sensor.stats.summary(2.0))
+        self.assertEqual('3 results, 1 failed, every 2.5 s (configured 2.0-8.0 s)', sensor.stats.summary(2.0, 8.0))
+
+    def test_keyed_failures(self):
+        sensor = tiny.CpuSensor(Queue.Queue(), {'cpu': 0})
+        sensor.publish({'0': 0.5})
+        sensor.publish(-1)
+        self.assertEqual((2, 1), (sensor.stats.results, sensor.stats.failures))
+
+    def test_reactor_lag(self):
+        clock = task.Clock()
+        with patch('tinydash.reactor', clock):
+            stats = tiny.DashboardStats()
+            stats.start()
+            clock.advance(1.0)
+            clock.advance(1.5)
+            stats.stop()
+            self.assertEqual(2, stats.reactor_lag.count)
+            self.assertEqual(0.5, stats.reactor_lag.max)
+            self.assertEqual([], clock.getDelayedCalls())
+
+    @patch('tinydash.Canvas')
+    def test_describe(self, Canvas):
+        status_text = Mock()
+        surface = tiny.CanvasSurface(Mock(), status_text, lambda emitter, name: name + ' [stats]')
+        emitter = Mock(width=40, height=40, widget=None)
+        surface.set_name(emitter, 'lamp')
+        surface.place(emitter, 0, 0)
+        surface.motion(Mock(x=10, y=10))
+        status_text.set.assert_called_with('lamp [stats]')
+        surface.remove(emitter)
+        status_text.set.assert_called_with('')
+
+
+if __name__ == '__main__':
+    unittest.main()
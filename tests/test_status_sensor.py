@@ -7,33 +7,46 @@ import imp
 
 tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
 
-add_callback_called = False
+add_callbacks_called = False
 
 
 class MockDeferred:
-    def addCallback(self, cb):
-        global add_callback_called
-        add_callback_called = True
+    def addCallbacks(self, cb, eb):
+        global add_callbacks_called
+        add_callbacks_called = True
 
 
 called_program = 'not called'
+called_timeout = None
 
 
-def getProcessValue(a, b, env):
-    global called_program
-    called_program = a
-    return MockDeferred()
+class MockRunner:
+    def get_value(self, program, timeout):
+        global called_program, called_timeout
+        called_program = program[0]
+        called_timeout = timeout
+        return MockDeferred()
 
 
 class TestSensorBase(unittest.TestCase):
     @patch('tinydash.SensorBase')
-    @patch('tinydash.utils.getProcessValue', getProcessValue)
+    @patch('tinydash.ProcessRunner.shared', MockRunner)
     def test_sensor(self, SensorBaseMock):
         queue = Queue.Queue()
-        sensor = tiny.StatusSensor(queue, {'update-interval': 0.1, 'program': ['foobar']})
+        sensor = tiny.StatusSensor(queue, {'update-interval': 0.1, 'program': ['foobar'], 'timeout': 3.0})
         sensor.run()
         self.assertEqual('foobar', called_program)
-        self.assertTrue(add_callback_called)
+        self.assertEqual(3.0, called_timeout)
+        self.assertTrue(add_callbacks_called)
+
+    @patch('tinydash.SensorBase.scheduler')
+    def test_fraction_output(self, scheduler):
+        queue = Queue.Queue()
+        sensor = tiny.FractionSensor(queue, {'update-interval': 2.0, 'program': ['meter']})
+        sensor.got_output('0.25\n')
+        sensor.got_output('')
+        self.assertEqual([0.25, -1.0], [queue.get(0)['result'] for _ in range(2)])
+        self.assertEqual(2, scheduler.schedule.call_count)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+import Queue
+import os
+import unittest
+from mock import patch, Mock
+
+import imp
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestStreamSensor(unittest.TestCase):
+    @patch('tinydash.reactor')
+    def test_lines(self, reactor):
+        queue = Queue.Queue()
+        sensor = tiny.FractionSensor(queue, {'program': ['meter'], 'stream': 'lines'})
+        sensor.start()
+        self.assertTrue(reactor.spawnProcess.called)
+        self.assertFalse(reactor.callLater.called)
+        proto = reactor.spawnProcess.call_args[0][0]
+        proto.outReceived('0.25\n0.')
+        proto.outReceived('5\r\nfoo\n')
+        self.assertEqual(0.25, queue.get(0)['result'])
+        self.assertEqual(0.5, queue.get(0)['result'])
+        self.assertEqual(-1, queue.get(0)['result'])
+        self.assertTrue(queue.empty())
+
+    @patch('tinydash.SensorBase.scheduler')
+    @patch('tinydash.reactor')
+    def test_poll(self, reactor, scheduler):
+        queue = Queue.Queue()
+        sensor = tiny.StatusSensor(queue, {'program': ['status'], 'stream': 'poll', 'update-interval': 2.0})
+        sensor.start()
+        scheduler.start.assert_called_once_with(sensor)
+        sensor.timeout_triggered()
+        reactor.spawnProcess.return_value.write.assert_called_with('\n')
+        reactor.spawnProcess.call_args[0][0].outReceived('1\n')
+        reactor.callLater.return_value.cancel.assert_called_once_with()
+        item = queue.get(0)
+        self.assertEqual(1, item['result'])
+        self.assertEqual(tiny.SensorBase.STATUS, item['value-type'])
+        scheduler.schedule.assert_called_with(sensor, 2.0)
+
+    @patch('tinydash.SensorBase.scheduler')
+    @patch('tinydash.reactor')
+    def test_poll_timeout(self, reactor, scheduler):
+        queue = Queue.Queue()
+        sensor = tiny.StatusSensor(queue, {'program': ['status'], 'stream': 'poll', 'update-interval': 2.0,
+                                           'timeout': 5.0})
+        sensor.start()
+        sensor.timeout_triggered()
+        reactor.callLater.assert_called_with(5.0, sensor.poll_timed_out)
+        sensor.poll_timed_out()
+        reactor.spawnProcess.return_value.signalProcess.assert_called_with('KILL')
+        self.assertEqual(-1, queue.get(0)['result'])
+        scheduler.schedule.assert_called_with(sensor, 2.0)
+        # The killed program ends, and is restarted
+        reactor.spawnProcess.call_args[0][0].processEnded(Mock())
+        self.assertEqual(-1, queue.get(0)['result'])
+        reactor.callLater.assert_called_with(1.0, sensor.spawn_stream)
+        self.assertEqual(1, scheduler.schedule.call_count)
+
+    @patch('tinydash.reactor')
+    def test_restart_backoff(self, reactor):
+        queue = Queue.Queue()
+        sensor = tiny.StateSensor(queue, {'program': ['state'], 'stream': True})
+        sensor.start()
+        proto = reactor.spawnProcess.call_args[0][0]
+        proto.processEnded(Mock())
+        self.assertEqual(-1, queue.get(0)['result'])
+        reactor.callLater.assert_called_with(1.0, sensor.spawn_stream)
+        proto.processEnded(Mock())
+        reactor.callLater.assert_called_with(2.0, sensor.spawn_stream)
+        proto.outReceived('running\n')
+        proto.processEnded(Mock())
+        reactor.callLater.assert_called_with(1.0, sensor.spawn_stream)
+
+
+if __name__ == '__main__':
+    unittest.main()
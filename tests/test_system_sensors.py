@@ -0,0 +1,85 @@
+import Queue
+import os
+import shutil
+import tempfile
+import unittest
+from mock import Mock, patch
+
+import imp
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestSystemSensors(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        patcher = patch.object(tiny.SensorBase, 'scheduler', Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as fp:
+            fp.write(content)
+        return path
+
+    def test_cpu(self):
+        queues = dict((cpu, Queue.Queue()) for cpu in (None, 0, 1, 7))
+        sensor = tiny.CpuSensor(queues[None], {})
+        for cpu in (0, 1, 7):
+            sensor.subscribe(queues[cpu], {'cpu': cpu})
+        stat = self.write('stat', 'cpu  20 0 20 60 0 0 0 0 0 0\n'
+                                  'cpu0 10 0 10 30 0 0 0 0 0 0\n'
+                                  'cpu1 10 0 10 30 0 0 0 0 0 0\n'
+                                  'intr 1 2 3\n')
+        with patch.object(tiny.CpuSensor, 'STAT', stat):
+            sensor.run()
+        self.assertEqual({None: 0.4, 0: 0.4, 1: 0.4, 7: -1},
+                         dict((cpu, queue.get(0)['result']) for cpu, queue in queues.items()))
+        self.write('stat', 'cpu  30 0 30 140 0 0 0 0 0 0\n'
+                           'cpu0 20 0 20 40 0 0 0 0 0 0\n'
+                           'cpu1 10 0 10 100 0 0 0 0 0 0\n')
+        with patch.object(tiny.CpuSensor, 'STAT', stat):
+            sensor.run()
+        self.assertEqual({None: 0.2, 0: 2.0 / 3, 1: 0.0, 7: -1},
+                         dict((cpu, queue.get(0)['result']) for cpu, queue in queues.items()))
+        self.assertEqual(set([None, 0, 1]), set(sensor.previous))
+
+    def test_memory(self):
+        queue = Queue.Queue()
+        sensor = tiny.MemorySensor(queue, {})
+        meminfo = self.write('meminfo', 'MemTotal: 1000 kB\nMemFree: 100 kB\nMemAvailable: 250 kB\n'
+                                        'SwapTotal: 200 kB\nSwapFree: 150 kB\nHugePages_Total: 0\n')
+        with patch.object(tiny.MemorySensor, 'MEMINFO', meminfo):
+            sensor.run()
+            self.assertEqual(0.75, queue.get(0)['result'])
+            sensor.swap = True
+            sensor.run()
+            self.assertEqual(0.25, queue.get(0)['result'])
+        with patch.object(tiny.MemorySensor, 'MEMINFO', os.path.join(self.dir, 'missing')):
+            sensor.run()
+        self.assertEqual(-1, queue.get(0)['result'])
+
+    @patch('tinydash.multiprocessing.cpu_count', lambda: 4)
+    def test_load(self):
+        queue = Queue.Queue()
+        loadavg = self.write('loadavg', '1.00 2.00 6.00 1/100 1234\n')
+        for period, result in ((1, 0.25), (5, 0.5), (15, 1.5), (3, -1)):
+            sensor = tiny.LoadSensor(queue, {'load-period': period})
+            with patch.object(tiny.LoadSensor, 'LOADAVG', loadavg):
+                sensor.run()
+            self.assertEqual(result, queue.get(0)['result'])
+
+    def test_disk(self):
+        queue = Queue.Queue()
+        sensor = tiny.DiskSensor(queue, {'path': self.dir})
+        sensor.run()
+        self.assertTrue(0.0 <= queue.get(0)['result'] <= 1.0)
+        sensor.path = os.path.join(self.dir, 'missing')
+        sensor.run()
+        self.assertEqual(-1, queue.get(0)['result'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import Queue
+import os
+import unittest
+
+import imp
+
+tiny = imp.load_source('tinydash', os.path.join(os.path.dirname(__file__), '..', 'bin', 'tiny-dash.py'))
+
+
+class TestValueSlot(unittest.TestCase):
+    def test_latest_value(self):
+        slot = tiny.ValueSlot()
+        self.assertTrue(slot.empty())
+        self.assertRaises(Queue.Empty, slot.get, 0)
+        for value in range(1000):
+            slot.put({'result': value})
+        self.assertEqual(999, slot.get(0)['result'])
+        self.assertRaises(Queue.Empty, slot.get, 0)
+
+    def test_sensor(self):
+        slot = tiny.ValueSlot()
+        sensor = tiny.StateSensor(slot, {})
+        sensor.publish('old')
+        sensor.publish('new')
+        self.assertEqual({'value-type': tiny.SensorBase.STATE, 'result': 'new'}, slot.get(0))
+
+
+if __name__ == '__main__':
+    unittest.main()